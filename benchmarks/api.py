@@ -0,0 +1,222 @@
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+from time import perf_counter
+
+import factory
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from benchmarks.stats import add_baseline_arguments, report, summarize
+from fast_zero.app import app
+from fast_zero.database import create_engine, get_read_session, get_session
+from fast_zero.models import Todo, User, table_registry
+from fast_zero.security import (
+    create_access_token,
+    get_password_hash,
+    password_hasher,
+)
+from fast_zero.settings import Settings, get_settings
+from tests.conftest import TodoFactory, UserFactory
+
+PASSWORD = 'benchmark'
+
+
+async def seed(engine, *, users: int, todos_per_user: int, batch: int = 1000):
+    async with engine.begin() as conn:
+        await conn.run_sync(table_registry.metadata.create_all)
+
+    # Every user shares one hash: Argon2 is deliberately slow and the
+    # benchmark is about the API, not about seeding.
+    password = await get_password_hash(PASSWORD)
+    seeded = []
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        for user in UserFactory.build_batch(users, password=password):
+            session.add(user)
+            seeded.append(user)
+
+        await session.commit()
+
+        for user in seeded:
+            rows = factory.build_batch(
+                dict,
+                todos_per_user,
+                FACTORY_CLASS=TodoFactory,
+                user_id=user.id,
+            )
+
+            for start in range(0, len(rows), batch):
+                await session.execute(
+                    insert(Todo), rows[start : start + batch]
+                )
+
+        await session.commit()
+
+    return seeded
+
+
+def scenarios(users: list[User], todos_per_user: int):
+    def auth(user):
+        token = create_access_token(data={'sub': user.email})
+        return {'Authorization': f'Bearer {token}'}
+
+    headers = {user.id: auth(user) for user in users}
+
+    def pick():
+        user = random.choice(users)
+        return user, headers[user.id]
+
+    def todo_id(user):
+        first = (user.id - 1) * todos_per_user + 1
+        return random.randint(first, first + max(todos_per_user - 1, 0))
+
+    def list_todos(client):
+        _, auth = pick()
+        return client.get('/todos/', headers=auth)
+
+    def list_todos_by_state(client):
+        _, auth = pick()
+        return client.get('/todos/?state=todo', headers=auth)
+
+    def search_todos(client):
+        _, auth = pick()
+        return client.get('/todos/?title=the', headers=auth)
+
+    def create_todo(client):
+        _, auth = pick()
+        return client.post(
+            '/todos/',
+            headers=auth,
+            json={'title': 'Bench', 'description': 'Bench', 'state': 'todo'},
+        )
+
+    def patch_todo(client):
+        user, auth = pick()
+        return client.patch(
+            f'/todos/{todo_id(user)}', headers=auth, json={'state': 'done'}
+        )
+
+    def list_users(client):
+        return client.get('/users/')
+
+    def find_user(client):
+        user, _ = pick()
+        return client.get(f'/users/{user.id}')
+
+    def login(client):
+        user, _ = pick()
+        return client.post(
+            '/auth/token', data={'username': user.email, 'password': PASSWORD}
+        )
+
+    return {
+        'GET /todos/': list_todos,
+        'GET /todos/?state': list_todos_by_state,
+        'GET /todos/?title': search_todos,
+        'POST /todos/': create_todo,
+        'PATCH /todos/{todo_id}': patch_todo,
+        'GET /users/': list_users,
+        'GET /users/{user_id}': find_user,
+        'POST /auth/token': login,
+    }
+
+
+async def drive(client, request, *, requests: int, concurrency: int):
+    latencies = []
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            start = perf_counter()
+            response = await request(client)
+            latencies.append(perf_counter() - start)
+            response.raise_for_status()
+
+    start = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    return summarize(latencies, perf_counter() - start)
+
+
+async def run(
+    *,
+    users: int = 10,
+    todos_per_user: int = 1000,
+    requests: int = 200,
+    concurrency: int = 10,
+    only: list[str] | None = None,
+) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        # The login scenario replays a handful of accounts far faster
+        # than the login throttle allows.
+        settings = Settings(
+            DATABASE_URL=f'sqlite+aiosqlite:///{directory}/bench.db',
+            RATE_LIMIT_ENABLED=False,
+        )
+        engine = create_engine(settings)
+
+        async def get_session_override():
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                yield session
+
+        app.dependency_overrides[get_session] = get_session_override
+        app.dependency_overrides[get_read_session] = get_session_override
+        app.dependency_overrides[get_settings] = lambda: settings
+
+        try:
+            seeded = await seed(
+                engine, users=users, todos_per_user=todos_per_user
+            )
+            results = {}
+            transport = ASGITransport(app=app)
+
+            async with AsyncClient(
+                transport=transport, base_url='http://bench'
+            ) as client:
+                for name, request in scenarios(seeded, todos_per_user).items():
+                    if only and name not in only:
+                        continue
+
+                    results[name] = await drive(
+                        client,
+                        request,
+                        requests=requests,
+                        concurrency=concurrency,
+                    )
+        finally:
+            app.dependency_overrides.clear()
+            password_hasher.shutdown()
+            await engine.dispose()
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Latency and throughput benchmark for the HTTP API.'
+    )
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--todos-per-user', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--only', action='append', metavar='ENDPOINT')
+    add_baseline_arguments(parser)
+    args = parser.parse_args(argv)
+
+    meta = {
+        'users': args.users,
+        'todos_per_user': args.todos_per_user,
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+    }
+    results = asyncio.run(run(**meta, only=args.only))
+
+    return report(results, meta, args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import argparse
+import asyncio
+import sys
+import tempfile
+from time import perf_counter
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from benchmarks.api import seed
+from benchmarks.stats import add_baseline_arguments, report, summarize
+from fast_zero.database import create_engine
+from fast_zero.models import Todo
+from fast_zero.queries import select_public_todos
+from fast_zero.responses import FastJSONResponse
+from fast_zero.schemas import MAX_PAGE_SIZE, TodoList
+from fast_zero.settings import Settings
+
+todo_list = TypeAdapter(TodoList)
+
+
+async def orm_response_model(session, user_id, limit):
+    # What FastAPI does for a handler returning ORM objects with a
+    # response_model: validate from attributes, dump to JSON-able Python,
+    # then encode with the stdlib.
+    todos = await session.scalars(
+        select(Todo).where(Todo.user_id == user_id).limit(limit)
+    )
+    payload = todo_list.validate_python(
+        {'todos': list(todos)}, from_attributes=True
+    )
+    session.expunge_all()
+
+    return JSONResponse(todo_list.dump_python(payload, mode='json')).body
+
+
+async def rows_fast_json(session, user_id, limit):
+    rows = await session.execute(
+        select_public_todos().where(Todo.user_id == user_id).limit(limit)
+    )
+
+    return FastJSONResponse({
+        'todos': [row._asdict() for row in rows],
+        'next_cursor': None,
+        'total': None,
+        'total_is_exact': None,
+    }).body
+
+
+PATHS = {
+    'orm + response_model': orm_response_model,
+    'rows + FastJSONResponse': rows_fast_json,
+}
+
+
+async def run(*, page: int = MAX_PAGE_SIZE, iterations: int = 500) -> dict:
+    results = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(
+            Settings(DATABASE_URL=f'sqlite+aiosqlite:///{directory}/bench.db')
+        )
+
+        try:
+            [user] = await seed(engine, users=1, todos_per_user=page)
+
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                for name, path in PATHS.items():
+                    latencies = []
+                    start = perf_counter()
+
+                    for _ in range(iterations):
+                        began = perf_counter()
+                        await path(session, user.id, page)
+                        latencies.append(perf_counter() - began)
+
+                    results[name] = summarize(
+                        latencies, perf_counter() - start
+                    )
+        finally:
+            await engine.dispose()
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='List endpoint serialization: ORM models vs. rows.'
+    )
+    parser.add_argument('--page', type=int, default=MAX_PAGE_SIZE)
+    parser.add_argument('--iterations', type=int, default=500)
+    add_baseline_arguments(parser)
+    args = parser.parse_args(argv)
+
+    meta = {'page': args.page, 'iterations': args.iterations}
+    results = asyncio.run(run(**meta))
+
+    return report(results, meta, args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
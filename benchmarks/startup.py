@@ -0,0 +1,96 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.stats import add_baseline_arguments, report, summarize
+from fast_zero.database import create_engine
+from fast_zero.models import table_registry
+from fast_zero.settings import Settings
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Runs in a fresh interpreter so every sample pays for a cold import, the
+# way a worker does when the autoscaler boots it.
+COLD_START = """
+import asyncio, json, time
+
+start = time.perf_counter()
+import fast_zero.app
+imported = time.perf_counter()
+
+from httpx import ASGITransport, AsyncClient
+
+async def first_request():
+    transport = ASGITransport(app=fast_zero.app.app)
+    async with AsyncClient(transport=transport, base_url='http://bench') as c:
+        started = time.perf_counter()
+        response = await c.get('/users/')
+        response.raise_for_status()
+        return time.perf_counter() - started
+
+print(json.dumps({
+    'import': imported - start,
+    'first_request': asyncio.run(first_request()),
+}))
+"""
+
+
+async def create_schema(url: str):
+    engine = create_engine(Settings(DATABASE_URL=url))
+
+    async with engine.begin() as conn:
+        await conn.run_sync(table_registry.metadata.create_all)
+
+    await engine.dispose()
+
+
+def cold_start(env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, '-c', COLD_START],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+
+    return json.loads(output)
+
+
+def run(*, runs: int = 10) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        url = f'sqlite+aiosqlite:///{directory}/startup.db'
+        asyncio.run(create_schema(url))
+        env = {**os.environ, 'DATABASE_URL': url}
+        samples = [cold_start(env) for _ in range(runs)]
+
+    imports = [sample['import'] for sample in samples]
+    first_requests = [sample['first_request'] for sample in samples]
+
+    return {
+        'import fast_zero.app': summarize(imports, sum(imports)),
+        'first GET /users/': summarize(first_requests, sum(first_requests)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Cold import and first-request latency of the app.'
+    )
+    parser.add_argument('--runs', type=int, default=10)
+    add_baseline_arguments(parser)
+    args = parser.parse_args(argv)
+
+    meta = {'runs': args.runs}
+    results = run(runs=args.runs)
+
+    return report(results, meta, args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
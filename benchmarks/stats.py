@@ -0,0 +1,98 @@
+import json
+import sys
+from pathlib import Path
+from statistics import quantiles
+
+
+def summarize(latencies: list[float], elapsed: float) -> dict:
+    # quantiles() needs at least two points to interpolate.
+    points = quantiles(
+        latencies * 2 if len(latencies) == 1 else latencies,
+        n=100,
+        method='inclusive',
+    )
+
+    return {
+        'requests': len(latencies),
+        'rps': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(points[49] * 1000, 3),
+        'p95_ms': round(points[94] * 1000, 3),
+        'p99_ms': round(points[98] * 1000, 3),
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    regressions = []
+
+    for name, base in baseline.items():
+        result = current.get(name)
+
+        if result is None:
+            continue
+
+        if result['p95_ms'] > base['p95_ms'] * (1 + threshold):
+            regressions.append(
+                f'{name}: p95 {base["p95_ms"]}ms -> {result["p95_ms"]}ms'
+            )
+
+        if result['rps'] < base['rps'] * (1 - threshold):
+            regressions.append(f'{name}: rps {base["rps"]} -> {result["rps"]}')
+
+    return regressions
+
+
+def format_table(results: dict) -> str:
+    header = f'{"endpoint":<32} {"req":>6} {"rps":>9} ' + ' '.join(
+        f'{p:>9}' for p in ('p50 ms', 'p95 ms', 'p99 ms')
+    )
+    lines = [header, '-' * len(header)]
+
+    for name, result in results.items():
+        lines.append(
+            f'{name:<32} {result["requests"]:>6} {result["rps"]:>9} '
+            f'{result["p50_ms"]:>9} {result["p95_ms"]:>9} '
+            f'{result["p99_ms"]:>9}'
+        )
+
+    return '\n'.join(lines)
+
+
+def load_results(path: Path) -> dict:
+    return json.loads(path.read_text(encoding='utf-8'))['results']
+
+
+def save_results(path: Path, results: dict, meta: dict):
+    path.write_text(
+        json.dumps({'meta': meta, 'results': results}, indent=2) + '\n',
+        encoding='utf-8',
+    )
+
+
+def add_baseline_arguments(parser):
+    parser.add_argument('--save', type=Path, metavar='BASELINE')
+    parser.add_argument('--compare', type=Path, metavar='BASELINE')
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.2,
+        help='allowed relative regression before failing (default: 0.2)',
+    )
+
+
+def report(results: dict, meta: dict, args) -> int:
+    print(format_table(results))
+
+    if args.save:
+        save_results(args.save, results, meta)
+
+    if args.compare:
+        regressions = compare(
+            load_results(args.compare), results, args.threshold
+        )
+
+        for regression in regressions:
+            print(f'REGRESSION {regression}', file=sys.stderr)
+
+        return 1 if regressions else 0
+
+    return 0
@@ -1,9 +1,40 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
-from fast_zero.routers import auth, todos, users
+from fast_zero.database import ReadYourWritesMiddleware
+from fast_zero.instrumentation import InstrumentationMiddleware
+from fast_zero.metrics import MetricsMiddleware, register_routes
+from fast_zero.routers import auth, metrics, todos, users
+from fast_zero.security import password_hasher
+from fast_zero.settings import get_settings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    password_hasher.shutdown()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+settings = get_settings()
+
+if settings.SQL_INSTRUMENTATION:
+    app.add_middleware(
+        InstrumentationMiddleware,
+        statement_budget=settings.SQL_STATEMENT_BUDGET,
+    )
+
+if settings.DATABASE_REPLICA_URLS:
+    app.add_middleware(
+        ReadYourWritesMiddleware, window=settings.READ_YOUR_WRITES_WINDOW
+    )
 
 app.include_router(users.router)
 app.include_router(auth.router)
 app.include_router(todos.router)
+
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router)
+    app.add_middleware(MetricsMiddleware)
+    register_routes(app.routes)
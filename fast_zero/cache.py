@@ -0,0 +1,96 @@
+from collections import OrderedDict
+from hashlib import sha256
+from time import time
+from typing import Any
+
+
+class TokenCache:
+    def __init__(self, maxsize: int = 10_000):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[bytes, tuple[float, int, Any]] = (
+            OrderedDict()
+        )
+        self._keys_by_user: dict[int, set[bytes]] = {}
+        # Bumped by every invalidate_user. Kept global rather than per user
+        # so it costs no memory; a lookup racing any invalidation simply
+        # goes uncached once.
+        self.generation = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        # Raw bearer tokens are never kept in memory, only their digest.
+        return sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Any | None:
+        key = self._key(token)
+        entry = self._entries.get(key)
+
+        if entry is None:
+            return None
+
+        expires_at, _, value = entry
+
+        if expires_at <= time():
+            self._discard(key)
+            return None
+
+        self._entries.move_to_end(key)
+
+        return value
+
+    def set(
+        self,
+        token: str,
+        value: Any,
+        *,
+        user_id: int,
+        expires_at: float,
+        generation: int | None = None,
+    ):
+        """Cache ``value`` for ``token``.
+
+        ``generation`` is the value of ``self.generation`` read before
+        ``value`` was loaded; if any user was invalidated since, the value
+        may be stale and is not cached.
+        """
+        if self.maxsize <= 0:
+            return
+
+        if generation is not None and generation != self.generation:
+            return
+
+        key = self._key(token)
+        self._discard(key)
+
+        while len(self._entries) >= self.maxsize:
+            self._discard(next(iter(self._entries)))
+
+        self._entries[key] = (expires_at, user_id, value)
+        self._keys_by_user.setdefault(user_id, set()).add(key)
+
+    def invalidate_user(self, user_id: int):
+        self.generation += 1
+
+        for key in self._keys_by_user.pop(user_id, ()):
+            self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+        self._keys_by_user.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _discard(self, key: bytes):
+        entry = self._entries.pop(key, None)
+
+        if entry is None:
+            return
+
+        keys = self._keys_by_user.get(entry[1])
+
+        if keys is not None:
+            keys.discard(key)
+
+            if not keys:
+                del self._keys_by_user[entry[1]]
@@ -1,10 +1,237 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import logging
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from itertools import count
+from time import monotonic, perf_counter
 
-from fast_zero.settings import Settings
+from fastapi import Request
+from sqlalchemy import event, make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.datastructures import MutableHeaders
 
-engine = create_async_engine(Settings().DATABASE_URL)
+from fast_zero.instrumentation import instrument_engine
+from fast_zero.metrics import db_pool_wait
+from fast_zero.settings import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+# Set on responses to writes; while present, reads go to the primary so a
+# client sees its own changes even if the replicas lag behind.
+PRIMARY_COOKIE = 'read_primary'
+SAFE_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    # _do_get is where the queue pool blocks for a free connection, so
+    # timing it measures checkout wait and nothing else.
+    def _do_get(self):
+        start = perf_counter()
+
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_wait.observe(perf_counter() - start)
+
+
+def engine_options(settings: Settings) -> dict:
+    url = make_url(settings.DATABASE_URL)
+    options = {'pool_pre_ping': settings.DATABASE_POOL_PRE_PING}
+
+    # In-memory SQLite runs on a single static connection, there is no
+    # pool to size.
+    in_memory = url.get_backend_name() == 'sqlite' and url.database in {
+        None,
+        '',
+        ':memory:',
+    }
+
+    if not in_memory:
+        options.update(
+            poolclass=TimedQueuePool,
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+            pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        )
+
+    timeout = settings.DATABASE_STATEMENT_TIMEOUT
+
+    if url.get_backend_name() == 'postgresql' and timeout:
+        if url.get_driver_name() == 'asyncpg':
+            options['connect_args'] = {
+                'server_settings': {'statement_timeout': str(timeout)}
+            }
+        else:
+            options['connect_args'] = {
+                'options': f'-c statement_timeout={timeout}'
+            }
+
+    return options
+
+
+def sqlite_pragmas(settings: Settings) -> dict[str, str | int]:
+    return {
+        'journal_mode': settings.SQLITE_JOURNAL_MODE,
+        'synchronous': settings.SQLITE_SYNCHRONOUS,
+        'busy_timeout': settings.SQLITE_BUSY_TIMEOUT,
+        'foreign_keys': 'ON' if settings.SQLITE_FOREIGN_KEYS else 'OFF',
+    }
+
+
+def apply_sqlite_pragmas(engine: AsyncEngine, pragmas: dict[str, str | int]):
+    @event.listens_for(engine.sync_engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+        cursor.close()
+
+
+def create_engine(settings: Settings) -> AsyncEngine:
+    engine = create_async_engine(
+        settings.DATABASE_URL, **engine_options(settings)
+    )
+
+    if engine.dialect.name == 'sqlite':
+        apply_sqlite_pragmas(engine, sqlite_pragmas(settings))
+
+    if settings.SQL_INSTRUMENTATION:
+        instrument_engine(engine)
+
+    return engine
+
+
+# Built on first use rather than at import. Settings are still read when
+# the app is imported; only the engine and its pool are deferred until a
+# session is first needed.
+@lru_cache
+def get_engine() -> AsyncEngine:
+    return create_engine(get_settings())
 
 
 async def get_session():  # pragma: no cover
-    async with AsyncSession(engine, expire_on_commit=False) as session:
+    async with AsyncSession(get_engine(), expire_on_commit=False) as session:
+        yield session
+
+
+class ReplicaSet:
+    def __init__(self, engines: list[AsyncEngine], *, retry_after: float):
+        self.engines = engines
+        self.retry_after = retry_after
+        self._down_until = [0.0] * len(engines)
+        self._turn = count()
+
+    def candidates(self):
+        # Round-robin over the replicas, skipping any that failed within
+        # the last retry_after seconds.
+        start = next(self._turn)
+        now = monotonic()
+
+        for offset in range(len(self.engines)):
+            index = (start + offset) % len(self.engines)
+
+            if self._down_until[index] <= now:
+                yield index, self.engines[index]
+
+    def mark_down(self, index: int):
+        self._down_until[index] = monotonic() + self.retry_after
+
+    async def connect(self) -> AsyncConnection | None:
+        for index, engine in self.candidates():
+            try:
+                return await engine.connect()
+            except (DBAPIError, OSError):
+                logger.warning(
+                    'Replica %s is unavailable', engine.url, exc_info=True
+                )
+                self.mark_down(index)
+
+        return None
+
+
+@lru_cache
+def get_replicas() -> ReplicaSet | None:
+    settings = get_settings()
+
+    if not settings.DATABASE_REPLICA_URLS:
+        return None
+
+    return ReplicaSet(
+        [
+            create_engine(settings.model_copy(update={'DATABASE_URL': url}))
+            for url in settings.DATABASE_REPLICA_URLS
+        ],
+        retry_after=settings.DATABASE_REPLICA_RETRY_AFTER,
+    )
+
+
+@asynccontextmanager
+async def read_session(
+    primary: AsyncEngine,
+    replicas: ReplicaSet | None,
+    *,
+    prefer_primary: bool = False,
+):
+    connection = None
+
+    if replicas is not None and not prefer_primary:
+        connection = await replicas.connect()
+
+    # No replica configured or reachable: fall back to the primary.
+    if connection is None:
+        async with AsyncSession(primary, expire_on_commit=False) as session:
+            yield session
+
+        return
+
+    try:
+        async with AsyncSession(
+            bind=connection, expire_on_commit=False
+        ) as session:
+            yield session
+    finally:
+        await connection.close()
+
+
+async def get_read_session(request: Request):  # pragma: no cover
+    async with read_session(
+        get_engine(),
+        get_replicas(),
+        prefer_primary=PRIMARY_COOKIE in request.cookies,
+    ) as session:
         yield session
+
+
+class ReadYourWritesMiddleware:
+    def __init__(self, app, *, window: int):
+        self.app = app
+        self.window = window
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['method'] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            if (
+                message['type'] == 'http.response.start'
+                and message['status'] < 400  # noqa: PLR2004
+            ):
+                MutableHeaders(scope=message).append(
+                    'Set-Cookie',
+                    f'{PRIMARY_COOKIE}=1; Max-Age={self.window}; Path=/; '
+                    'HttpOnly; SameSite=lax',
+                )
+
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
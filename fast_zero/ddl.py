@@ -0,0 +1,271 @@
+from sqlalchemy import DDL, MetaData, Table, event
+
+# The trigram tokenizer keeps substring semantics (the old LIKE '%x%'
+# filter) while letting SQLite answer them from the index.
+TODO_SEARCH_CREATE = {
+    'sqlite': [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS todos_fts USING fts5(
+            title, description,
+            content='todos', content_rowid='id', tokenize='trigram'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS todos_fts_insert AFTER INSERT ON todos
+        BEGIN
+            INSERT INTO todos_fts (rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS todos_fts_delete AFTER DELETE ON todos
+        BEGIN
+            INSERT INTO todos_fts (todos_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS todos_fts_update
+        AFTER UPDATE OF title, description ON todos
+        BEGIN
+            INSERT INTO todos_fts (todos_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO todos_fts (rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+        """,
+    ],
+    'postgresql': [
+        'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+        """
+        CREATE INDEX IF NOT EXISTS ix_todos_title_trgm
+        ON todos USING gin (title gin_trgm_ops)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_todos_description_trgm
+        ON todos USING gin (description gin_trgm_ops)
+        """,
+    ],
+}
+
+TODO_SEARCH_DROP = {
+    'sqlite': ['DROP TABLE IF EXISTS todos_fts'],
+}
+
+# todo_counts holds one row per (user_id, state). Keeping it in step from
+# triggers covers every write path (bulk statements, imports, cascades),
+# not only the ones going through the ORM.
+TODO_COUNTS_CREATE = {
+    'sqlite': [
+        """
+        CREATE TRIGGER IF NOT EXISTS todo_counts_insert AFTER INSERT ON todos
+        BEGIN
+            INSERT INTO todo_counts (user_id, state, count)
+            VALUES (new.user_id, new.state, 1)
+            ON CONFLICT (user_id, state) DO UPDATE SET count = count + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS todo_counts_delete AFTER DELETE ON todos
+        BEGIN
+            UPDATE todo_counts SET count = count - 1
+            WHERE user_id = old.user_id AND state = old.state;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS todo_counts_update
+        AFTER UPDATE OF state, user_id ON todos
+        BEGIN
+            UPDATE todo_counts SET count = count - 1
+            WHERE user_id = old.user_id AND state = old.state;
+            INSERT INTO todo_counts (user_id, state, count)
+            VALUES (new.user_id, new.state, 1)
+            ON CONFLICT (user_id, state) DO UPDATE SET count = count + 1;
+        END
+        """,
+    ],
+    'postgresql': [
+        """
+        CREATE OR REPLACE FUNCTION todo_counts_sync() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE todo_counts SET count = count - 1
+                WHERE user_id = OLD.user_id AND state = OLD.state;
+            END IF;
+
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO todo_counts (user_id, state, count)
+                VALUES (NEW.user_id, NEW.state, 1)
+                ON CONFLICT (user_id, state)
+                DO UPDATE SET count = todo_counts.count + 1;
+            END IF;
+
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        'DROP TRIGGER IF EXISTS todo_counts_sync ON todos',
+        """
+        CREATE TRIGGER todo_counts_sync
+        AFTER INSERT OR DELETE OR UPDATE OF state, user_id ON todos
+        FOR EACH ROW EXECUTE FUNCTION todo_counts_sync()
+        """,
+    ],
+}
+
+TODO_COUNTS_DROP = {
+    'postgresql': ['DROP FUNCTION IF EXISTS todo_counts_sync() CASCADE'],
+}
+
+
+# users.version changes whenever the user's public fields do, and
+# users.todo_version whenever any of their todos does. Both feed the ETags
+# of the user and todo reads, so triggers keep them exact for every write
+# path, cascades included.
+#
+# todo_version doubles as the user's change sequence: each changed todo is
+# stamped with the value it was bumped to, and each deleted one leaves a
+# tombstone carrying it, so GET /todos/changes can read a range of it.
+VERSION_CREATE = {
+    'sqlite': [
+        """
+        CREATE TRIGGER IF NOT EXISTS users_version_update
+        AFTER UPDATE OF username, email, password ON users
+        BEGIN
+            UPDATE users SET version = version + 1 WHERE id = new.id;
+        END
+        """,
+        # SQLite may hand out the id of a deleted row again; the new todo
+        # supersedes the old tombstone.
+        """
+        CREATE TRIGGER IF NOT EXISTS todos_version_insert
+        AFTER INSERT ON todos
+        BEGIN
+            UPDATE users SET todo_version = todo_version + 1
+            WHERE id = new.user_id;
+            UPDATE todos SET change_seq = (
+                SELECT todo_version FROM users WHERE id = new.user_id
+            ) WHERE id = new.id;
+            DELETE FROM todo_tombstones WHERE todo_id = new.id;
+        END
+        """,
+        # The SELECT finds nothing when the owner itself is being deleted,
+        # so cascades leave no tombstones behind.
+        """
+        CREATE TRIGGER IF NOT EXISTS todos_version_delete
+        AFTER DELETE ON todos
+        BEGIN
+            UPDATE users SET todo_version = todo_version + 1
+            WHERE id = old.user_id;
+            INSERT INTO todo_tombstones (todo_id, user_id, change_seq)
+            SELECT old.id, id, todo_version FROM users WHERE id = old.user_id
+            ON CONFLICT (todo_id) DO UPDATE SET
+                user_id = excluded.user_id, change_seq = excluded.change_seq;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS todos_version_update
+        AFTER UPDATE OF title, description, state, user_id ON todos
+        BEGIN
+            UPDATE users SET todo_version = todo_version + 1
+            WHERE id IN (old.user_id, new.user_id);
+            INSERT INTO todo_tombstones (todo_id, user_id, change_seq)
+            SELECT old.id, id, todo_version FROM users
+            WHERE id = old.user_id AND old.user_id <> new.user_id
+            ON CONFLICT (todo_id) DO UPDATE SET
+                user_id = excluded.user_id, change_seq = excluded.change_seq;
+            UPDATE todos SET change_seq = (
+                SELECT todo_version FROM users WHERE id = new.user_id
+            ) WHERE id = new.id;
+        END
+        """,
+    ],
+    'postgresql': [
+        """
+        CREATE OR REPLACE FUNCTION users_bump_version() RETURNS trigger AS $$
+        BEGIN
+            NEW.version := OLD.version + 1;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        'DROP TRIGGER IF EXISTS users_version_update ON users',
+        """
+        CREATE TRIGGER users_version_update
+        BEFORE UPDATE OF username, email, password ON users
+        FOR EACH ROW EXECUTE FUNCTION users_bump_version()
+        """,
+        """
+        CREATE OR REPLACE FUNCTION todos_bump_version() RETURNS trigger AS $$
+        DECLARE
+            seq integer;
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE users SET todo_version = todo_version + 1
+                WHERE id = OLD.user_id
+                RETURNING todo_version INTO seq;
+
+                IF FOUND AND (TG_OP = 'DELETE'
+                    OR NEW.user_id <> OLD.user_id) THEN
+                    INSERT INTO todo_tombstones (todo_id, user_id, change_seq)
+                    VALUES (OLD.id, OLD.user_id, seq)
+                    ON CONFLICT (todo_id) DO UPDATE SET
+                        user_id = excluded.user_id,
+                        change_seq = excluded.change_seq;
+                END IF;
+            END IF;
+
+            IF TG_OP = 'DELETE' THEN
+                RETURN OLD;
+            END IF;
+
+            IF TG_OP = 'INSERT' OR NEW.user_id <> OLD.user_id THEN
+                UPDATE users SET todo_version = todo_version + 1
+                WHERE id = NEW.user_id
+                RETURNING todo_version INTO seq;
+            END IF;
+
+            NEW.change_seq := seq;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        'DROP TRIGGER IF EXISTS todos_version ON todos',
+        """
+        CREATE TRIGGER todos_version
+        BEFORE INSERT OR DELETE
+        OR UPDATE OF title, description, state, user_id ON todos
+        FOR EACH ROW EXECUTE FUNCTION todos_bump_version()
+        """,
+    ],
+}
+
+VERSION_DROP = {
+    'postgresql': [
+        'DROP FUNCTION IF EXISTS todos_bump_version() CASCADE',
+        'DROP FUNCTION IF EXISTS users_bump_version() CASCADE',
+    ],
+}
+
+
+# Emits dialect specific DDL alongside metadata.create_all()/drop_all();
+# migrations carry their own copy of these statements. DDL spanning several
+# tables is attached to the MetaData so it runs once all of them exist.
+def attach_ddl(
+    target: Table | MetaData, create: dict, drop: dict | None = None
+):
+    for dialect, statements in create.items():
+        for statement in statements:
+            event.listen(
+                target,
+                'after_create',
+                DDL(statement).execute_if(dialect=dialect),
+            )
+
+    for dialect, statements in (drop or {}).items():
+        for statement in statements:
+            event.listen(
+                target,
+                'before_drop',
+                DDL(statement).execute_if(dialect=dialect),
+            )
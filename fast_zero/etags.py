@@ -0,0 +1,39 @@
+from hashlib import blake2b
+from http import HTTPStatus
+
+from fastapi import Request, Response
+
+# Clients must revalidate before reusing a cached copy, which is what
+# makes the version-based 304 safe.
+CACHE_CONTROL = 'private, no-cache'
+
+
+def make_etag(*parts) -> str:
+    digest = blake2b(
+        '\x1f'.join(map(str, parts)).encode(), digest_size=16
+    ).hexdigest()
+
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get('if-none-match')
+
+    if not header:
+        return False
+
+    # If-None-Match uses weak comparison, so a W/ prefix is ignored.
+    candidates = {tag.strip().removeprefix('W/') for tag in header.split(',')}
+
+    return '*' in candidates or etag in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=HTTPStatus.NOT_MODIFIED,
+        headers={'ETag': etag, 'Cache-Control': CACHE_CONTROL},
+    )
+
+
+def cache_headers(etag: str) -> dict[str, str]:
+    return {'ETag': etag, 'Cache-Control': CACHE_CONTROL}
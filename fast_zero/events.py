@@ -0,0 +1,148 @@
+import asyncio
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Protocol
+
+from pydantic_core import to_json
+
+from fast_zero.settings import get_settings
+
+
+@dataclass(frozen=True, slots=True)
+class Event:
+    type: str
+    data: dict
+
+    def to_sse(self) -> bytes:
+        return b'event: %s\ndata: %s\n\n' % (
+            self.type.encode(),
+            to_json(self.data),
+        )
+
+
+# Sent in place of the events a slow subscriber missed, right before its
+# stream ends; clients catch up from GET /todos/changes and reconnect.
+OVERFLOW = Event('overflow', {})
+
+
+def changed(count: int) -> Event:
+    """Announce ``count`` rows written by a bulk request or import batch.
+
+    Those publish this instead of an event per row, so one request cannot
+    overflow every subscriber's queue; clients fetch GET /todos/changes.
+    """
+    return Event('changed', {'count': count})
+
+
+class Subscription:
+    def __init__(self, maxsize: int):
+        self._queue: asyncio.Queue[Event] = asyncio.Queue(maxsize)
+
+    def offer(self, event: Event) -> bool:
+        """Queue an event without waiting; False disconnects the subscriber.
+
+        A full queue means the consumer is not keeping up. What it has not
+        read yet is dropped for a single OVERFLOW event, so neither memory
+        nor the publisher is held hostage by one slow connection.
+        """
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self._queue.empty():
+                self._queue.get_nowait()
+
+            self._queue.put_nowait(OVERFLOW)
+            return False
+
+        return True
+
+    async def get(self) -> Event:
+        return await self._queue.get()
+
+
+class Broker(Protocol):
+    async def publish(self, channel: str, event: Event) -> None: ...
+
+    def subscribe(
+        self, channel: str
+    ) -> AbstractAsyncContextManager[Subscription]: ...
+
+
+class MemoryBroker:
+    """Fan events out to subscribers of this process only.
+
+    Good for a single worker and for tests; with several workers every one
+    of them needs to see every publish, which takes a shared backend.
+    """
+
+    def __init__(self, *, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: dict[str, set[Subscription]] = {}
+
+    async def publish(self, channel: str, event: Event):
+        for subscription in tuple(self._subscribers.get(channel, ())):
+            if not subscription.offer(event):
+                self._unsubscribe(channel, subscription)
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str):
+        subscription = Subscription(self.queue_size)
+        self._subscribers.setdefault(channel, set()).add(subscription)
+
+        try:
+            yield subscription
+        finally:
+            self._unsubscribe(channel, subscription)
+
+    def subscribers(self, channel: str) -> int:
+        return len(self._subscribers.get(channel, ()))
+
+    def _unsubscribe(self, channel: str, subscription: Subscription):
+        subscriptions = self._subscribers.get(channel)
+
+        if subscriptions is None:
+            return
+
+        subscriptions.discard(subscription)
+
+        if not subscriptions:
+            del self._subscribers[channel]
+
+
+_backends = {
+    'memory': MemoryBroker,
+}
+
+
+@lru_cache
+def get_broker() -> Broker:
+    settings = get_settings()
+
+    return _backends[settings.EVENT_BROKER](
+        queue_size=settings.EVENT_QUEUE_SIZE
+    )
+
+
+def todo_channel(user_id: int) -> str:
+    return f'todos:{user_id}'
+
+
+async def event_stream(broker: Broker, channel: str, *, heartbeat: float):
+    async with broker.subscribe(channel) as subscription:
+        # Flushes the headers and tells the client it is subscribed.
+        yield b': subscribed\n\n'
+
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), heartbeat)
+            except TimeoutError:
+                # Keeps proxies from timing the connection out and surfaces
+                # clients that went away without closing it.
+                yield b': keepalive\n\n'
+                continue
+
+            yield event.to_sse()
+
+            if event is OVERFLOW:
+                return
@@ -0,0 +1,126 @@
+import logging
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class RequestStats:
+    statements: int = 0
+    db_seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: str | None = None
+    repeated: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, seconds: float):
+        self.statements += 1
+        self.db_seconds += seconds
+        self.repeated[statement] += 1
+
+        if seconds > self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+    def server_timing(self, handler_seconds: float) -> str:
+        return (
+            f'db;dur={self.db_seconds * 1000:.2f}'
+            f';desc="{self.statements} statements", '
+            f'db-slowest;dur={self.slowest_seconds * 1000:.2f}, '
+            f'app;dur={handler_seconds * 1000:.2f}'
+        )
+
+
+_current_stats: ContextVar[RequestStats | None] = ContextVar(
+    'request_stats', default=None
+)
+
+
+def current_stats() -> RequestStats | None:
+    return _current_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, *args):
+    if _current_stats.get() is not None:
+        conn.info.setdefault('query_start', []).append(perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, *args):
+    stats = _current_stats.get()
+
+    if stats is not None and conn.info.get('query_start'):
+        stats.record(
+            statement, perf_counter() - conn.info['query_start'].pop()
+        )
+
+
+def instrument_engine(engine: AsyncEngine):
+    event.listen(
+        engine.sync_engine, 'before_cursor_execute', _before_cursor_execute
+    )
+    event.listen(
+        engine.sync_engine, 'after_cursor_execute', _after_cursor_execute
+    )
+
+
+class InstrumentationMiddleware:
+    def __init__(self, app, *, statement_budget: int):
+        self.app = app
+        self.statement_budget = statement_budget
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        start = perf_counter()
+
+        async def send_with_timing(message):
+            if message['type'] == 'http.response.start':
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    'Server-Timing',
+                    stats.server_timing(perf_counter() - start),
+                )
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+
+        if stats.statements > self.statement_budget:
+            self._report(scope, stats)
+
+    def _report(self, scope, stats: RequestStats):
+        statement, count = stats.repeated.most_common(1)[0]
+
+        logger.warning(
+            '%s %s issued %d SQL statements (budget %d, %.2fms in the '
+            'database); slowest took %.2fms: %s',
+            scope['method'],
+            scope['path'],
+            stats.statements,
+            self.statement_budget,
+            stats.db_seconds * 1000,
+            stats.slowest_seconds * 1000,
+            stats.slowest_statement,
+        )
+
+        if count > 1:
+            logger.warning(
+                'Possible N+1 in %s %s: statement ran %d times: %s',
+                scope['method'],
+                scope['path'],
+                count,
+                statement,
+            )
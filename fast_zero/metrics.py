@@ -0,0 +1,264 @@
+from bisect import bisect_left
+from time import perf_counter
+
+from fast_zero.settings import get_settings
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ''
+
+    pairs = ','.join(
+        '{}="{}"'.format(
+            name,
+            value
+            .replace('\\', r'\\')
+            .replace('"', r'\"')
+            .replace('\n', r'\n'),
+        )
+        for name, value in labels.items()
+    )
+
+    return '{' + pairs + '}'
+
+
+class Counter:
+    type = 'counter'
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def samples(self, name: str, labels: dict[str, str]):
+        yield f'{name}_total', labels, self.value
+
+
+class Gauge:
+    type = 'gauge'
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+    def samples(self, name: str, labels: dict[str, str]):
+        yield name, labels, self.value
+
+
+class Histogram:
+    type = 'histogram'
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = tuple(sorted(buckets))
+        # One slot per bucket plus the implicit +Inf bucket. Counts are
+        # kept per bucket and only made cumulative on exposition.
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def samples(self, name: str, labels: dict[str, str]):
+        cumulative = 0
+
+        for bound, count in zip(
+            (*self.buckets, float('inf')), self.counts, strict=True
+        ):
+            cumulative += count
+            yield (
+                f'{name}_bucket',
+                {**labels, 'le': _format_value(bound)},
+                cumulative,
+            )
+
+        yield f'{name}_sum', labels, self.sum
+        yield f'{name}_count', labels, cumulative
+
+
+class Metric:
+    """A named metric family, optionally split by labels.
+
+    Children are created once per distinct label values and cached; hot
+    paths should bind them up front with ``labels()`` and keep the child.
+    """
+
+    def __init__(
+        self,
+        kind,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        **options,
+    ):
+        self.kind = kind
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.options = options
+        self.children = {}
+
+        if not labelnames:
+            self.children[()] = kind(**options)
+
+    def labels(self, *values: str):
+        child = self.children.get(values)
+
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(
+                    f'{self.name} expects labels {self.labelnames}'
+                )
+
+            child = self.children[values] = self.kind(**self.options)
+
+        return child
+
+    def __getattr__(self, name):
+        # Unlabelled metrics proxy inc/observe/... to their single child.
+        if self.labelnames or name.startswith('_'):
+            raise AttributeError(name)
+
+        return getattr(self.children[()], name)
+
+    def expose(self) -> str:
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.kind.type}',
+        ]
+
+        for values, child in self.children.items():
+            labels = dict(zip(self.labelnames, values, strict=True))
+
+            for name, sample_labels, value in child.samples(self.name, labels):
+                lines.append(
+                    f'{name}{_format_labels(sample_labels)} '
+                    f'{_format_value(value)}'
+                )
+
+        return '\n'.join(lines)
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f'Metric {metric.name} is already registered')
+
+        self.metrics[metric.name] = metric
+
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Metric(Counter, name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Metric(Gauge, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), *, buckets):
+        return self.register(
+            Metric(Histogram, name, documentation, labelnames, buckets=buckets)
+        )
+
+    def expose(self) -> str:
+        return (
+            '\n'.join(metric.expose() for metric in self.metrics.values())
+            + '\n'
+        )
+
+
+registry = Registry()
+
+http_request_duration = registry.histogram(
+    'http_request_duration_seconds',
+    'Time spent handling HTTP requests.',
+    ('method', 'route'),
+    buckets=get_settings().METRICS_LATENCY_BUCKETS,
+)
+http_requests_in_flight = registry.gauge(
+    'http_requests_in_flight',
+    'HTTP requests currently being handled.',
+)
+db_pool_wait = registry.histogram(
+    'db_pool_checkout_wait_seconds',
+    'Time spent waiting to check a connection out of the pool.',
+    buckets=get_settings().METRICS_POOL_WAIT_BUCKETS,
+)
+password_hash_duration = registry.histogram(
+    'password_hash_duration_seconds',
+    'Time spent hashing or verifying passwords, excluding queue wait.',
+    ('operation',),
+    buckets=get_settings().METRICS_PASSWORD_HASH_BUCKETS,
+)
+jwt_validation_failures = registry.counter(
+    'jwt_validation_failures',
+    'Bearer tokens rejected while authenticating a request.',
+    ('reason',),
+)
+rate_limit_rejections = registry.counter(
+    'rate_limit_rejections',
+    'Requests refused with 429 by a rate limit.',
+    ('limit',),
+)
+
+# Requests that match no route share a single series, so scanners probing
+# random paths cannot grow the registry without bound.
+UNMATCHED_ROUTE = 'unmatched'
+_unmatched_duration = http_request_duration.labels('*', UNMATCHED_ROUTE)
+_route_durations: dict[str, dict[str, Histogram]] = {}
+
+
+def register_routes(routes):
+    """Bind the per-route series up front so requests only look them up."""
+    for route in routes:
+        series = _route_durations.setdefault(route.path, {})
+
+        for method in getattr(route, 'methods', None) or ():
+            series[method] = http_request_duration.labels(method, route.path)
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        http_requests_in_flight.inc()
+        start = perf_counter()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            http_requests_in_flight.dec()
+
+            # Only methods a registered route declares get their own
+            # series; anything else (404s, 405s) lands in the unmatched one.
+            route = scope.get('route')
+            series = _route_durations.get(route.path) if route else None
+            histogram = (
+                series.get(scope['method'], _unmatched_duration)
+                if series
+                else _unmatched_duration
+            )
+            histogram.observe(perf_counter() - start)
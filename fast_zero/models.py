@@ -1,9 +1,19 @@
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import ForeignKey, func
+from sqlalchemy import ForeignKey, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, registry, relationship
 
+from fast_zero.ddl import (
+    TODO_COUNTS_CREATE,
+    TODO_COUNTS_DROP,
+    TODO_SEARCH_CREATE,
+    TODO_SEARCH_DROP,
+    VERSION_CREATE,
+    VERSION_DROP,
+    attach_ddl,
+)
+
 table_registry = registry()
 
 
@@ -26,19 +36,72 @@ class User:
     created_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now()
     )
+    # Bumped by triggers, see fast_zero.ddl.VERSION_CREATE.
+    version: Mapped[int] = mapped_column(init=False, server_default='0')
+    todo_version: Mapped[int] = mapped_column(init=False, server_default='0')
 
     todos: Mapped[list['Todo']] = relationship(
-        init=False, cascade='all, delete-orphan', lazy='selectin'
+        init=False,
+        cascade='all, delete-orphan',
+        lazy='raise',
+        passive_deletes=True,
     )
 
 
 @table_registry.mapped_as_dataclass
 class Todo:
     __tablename__ = 'todos'
+    __table_args__ = (
+        # Every todo query is scoped to its owner and pages by id,
+        # optionally narrowed by state.
+        Index('ix_todos_user_id_id', 'user_id', 'id'),
+        Index('ix_todos_user_id_state_id', 'user_id', 'state', 'id'),
+        Index('ix_todos_user_id_change_seq', 'user_id', 'change_seq'),
+    )
+    # On SQLite change_seq is stamped after the INSERT, so a RETURNING
+    # would hand back the placeholder; leave it to be loaded on access.
+    __mapper_args__ = {'eager_defaults': False}
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     title: Mapped[str]
     description: Mapped[str]
     state: Mapped[TodoState]
 
-    user_id: Mapped[int] = mapped_column(ForeignKey('users.id'))
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey('users.id', ondelete='CASCADE')
+    )
+    # The owner's todo_version as of this row's last change, stamped by
+    # the same triggers that bump it.
+    change_seq: Mapped[int] = mapped_column(init=False, server_default='0')
+
+
+@table_registry.mapped_as_dataclass
+class TodoTombstone:
+    __tablename__ = 'todo_tombstones'
+    __table_args__ = (
+        Index(
+            'ix_todo_tombstones_user_id_change_seq', 'user_id', 'change_seq'
+        ),
+    )
+
+    todo_id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey('users.id', ondelete='CASCADE')
+    )
+    change_seq: Mapped[int]
+
+
+@table_registry.mapped_as_dataclass
+class TodoCount:
+    __tablename__ = 'todo_counts'
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey('users.id', ondelete='CASCADE'), primary_key=True
+    )
+    state: Mapped[TodoState] = mapped_column(primary_key=True)
+    count: Mapped[int] = mapped_column(default=0)
+
+
+attach_ddl(Todo.__table__, TODO_SEARCH_CREATE, TODO_SEARCH_DROP)
+attach_ddl(table_registry.metadata, TODO_COUNTS_CREATE, TODO_COUNTS_DROP)
+attach_ddl(table_registry.metadata, VERSION_CREATE, VERSION_DROP)
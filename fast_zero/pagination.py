@@ -0,0 +1,42 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+
+def encode_cursor(key: int) -> str:
+    return urlsafe_b64encode(str(key).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str | int | None) -> int | None:
+    if cursor is None or isinstance(cursor, int):
+        return cursor
+
+    try:
+        key = int(urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (BinasciiError, ValueError):
+        raise ValueError('Invalid cursor')
+
+    if key < 0:
+        raise ValueError('Invalid cursor')
+
+    return key
+
+
+def paginate(query, key, page):
+    # Seeking on an indexed key stays cheap no matter how deep the client
+    # pages, unlike OFFSET which has to walk every skipped row.
+    if page.after is not None:
+        query = query.where(key > page.after)
+
+    # One extra row tells whether there is a next page.
+    return query.order_by(key).offset(page.offset).limit(page.limit + 1)
+
+
+def split_page(rows, page):
+    rows = list(rows)
+
+    if len(rows) <= page.limit:
+        return rows, None
+
+    rows = rows[: page.limit]
+
+    return rows, encode_cursor(rows[-1].id)
@@ -0,0 +1,17 @@
+from sqlalchemy import Select, select
+
+from fast_zero.models import Todo, User
+
+# Column sets matching UserPublic and TodoPublic. Selecting (or RETURNING)
+# these instead of whole entities keeps password hashes and unused columns
+# off the wire and puts no objects in the session's identity map.
+USER_PUBLIC_COLUMNS = (User.id, User.username, User.email)
+TODO_PUBLIC_COLUMNS = (Todo.title, Todo.description, Todo.state, Todo.id)
+
+
+def select_public_users() -> Select:
+    return select(*USER_PUBLIC_COLUMNS)
+
+
+def select_public_todos() -> Select:
+    return select(*TODO_PUBLIC_COLUMNS)
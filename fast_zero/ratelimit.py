@@ -0,0 +1,153 @@
+from http import HTTPStatus
+from math import ceil
+from time import monotonic
+from typing import Annotated, Protocol
+
+from fastapi import Depends, HTTPException, Request
+from fastapi.security import OAuth2PasswordRequestForm
+
+from fast_zero.metrics import rate_limit_rejections
+from fast_zero.settings import Settings, get_settings
+
+
+class BucketStore(Protocol):
+    async def take(self, key: str, *, capacity: int, rate: float) -> float:
+        """Spend a token from ``key``'s bucket.
+
+        Returns 0 when one was available, otherwise the seconds until the
+        bucket refills enough to allow the next request.
+        """
+
+    def clear(self) -> None: ...
+
+
+class MemoryBucketStore:
+    """Token buckets for this process, one dict entry per key.
+
+    A bucket left alone long enough refills to capacity, and a full bucket
+    behaves exactly like one that was never created, so those are dropped
+    every ``sweep_interval`` seconds without changing any outcome.
+    """
+
+    def __init__(self, *, sweep_interval: float = 60.0, clock=monotonic):
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+        # key -> (tokens, updated_at, full_at)
+        self._buckets: dict[str, tuple[float, float, float]] = {}
+        self._next_sweep = clock() + sweep_interval
+
+    @classmethod
+    def from_settings(cls, settings: Settings):
+        return cls(sweep_interval=settings.RATE_LIMIT_SWEEP_INTERVAL)
+
+    async def take(self, key: str, *, capacity: int, rate: float) -> float:
+        now = self.clock()
+
+        if now >= self._next_sweep:
+            self._sweep(now)
+
+        tokens, updated_at, _ = self._buckets.get(key, (capacity, now, now))
+        tokens = min(capacity, tokens + (now - updated_at) * rate)
+        wait = 0.0
+
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+
+        self._buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+
+        return wait
+
+    def clear(self):
+        self._buckets.clear()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def _sweep(self, now: float):
+        self._buckets = {
+            key: bucket
+            for key, bucket in self._buckets.items()
+            if bucket[2] > now
+        }
+        self._next_sweep = now + self.sweep_interval
+
+
+_backends = {
+    'memory': MemoryBucketStore,
+}
+
+
+def create_bucket_store(settings: Settings) -> BucketStore:
+    return _backends[settings.RATE_LIMIT_STORE].from_settings(settings)
+
+
+bucket_store = create_bucket_store(get_settings())
+
+_rejections = {
+    name: rate_limit_rejections.labels(name)
+    for name in ('login_ip', 'login_account', 'signup_ip')
+}
+
+
+def client_ip(request: Request) -> str:
+    # Behind a proxy this is only the client's address when the server
+    # trusts forwarded headers (uvicorn --proxy-headers).
+    return request.client.host if request.client else 'unknown'
+
+
+async def throttle(name: str, key: str, per_minute: int):
+    """Spend a token for ``key``, or fail with 429 and Retry-After.
+
+    Each bucket holds ``per_minute`` tokens and refills at that rate, so
+    short bursts pass while sustained traffic is held to the limit.
+    """
+    if per_minute <= 0:
+        return
+
+    wait = await bucket_store.take(
+        f'{name}:{key}', capacity=per_minute, rate=per_minute / 60
+    )
+
+    if wait:
+        _rejections[name].inc()
+        raise HTTPException(
+            status_code=HTTPStatus.TOO_MANY_REQUESTS,
+            detail='Too many requests, try again later',
+            headers={'Retry-After': str(ceil(wait))},
+        )
+
+
+# Both limits run as dependencies, so a throttled request is refused
+# before its password is ever hashed or verified.
+async def limit_login(
+    request: Request,
+    form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
+    settings: Annotated[Settings, Depends(get_settings)],
+):
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+
+    await throttle(
+        'login_ip', client_ip(request), settings.RATE_LIMIT_LOGIN_PER_IP
+    )
+    # Per account as well, so spreading a stuffing run over many addresses
+    # does not multiply the guesses one account gets.
+    await throttle(
+        'login_account',
+        form_data.username.lower(),
+        settings.RATE_LIMIT_LOGIN_PER_ACCOUNT,
+    )
+
+
+async def limit_signup(
+    request: Request,
+    settings: Annotated[Settings, Depends(get_settings)],
+):
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+
+    await throttle(
+        'signup_ip', client_ip(request), settings.RATE_LIMIT_SIGNUP_PER_IP
+    )
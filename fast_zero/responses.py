@@ -0,0 +1,10 @@
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class FastJSONResponse(JSONResponse):
+    # For payloads built straight from database rows: returning the
+    # response skips response_model validation, and pydantic-core encodes
+    # it in one pass without going through jsonable_encoder.
+    def render(self, content) -> bytes:  # noqa: PLR6301
+        return to_json(content)
@@ -8,28 +8,38 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from fast_zero.database import get_session
 from fast_zero.models import User
+from fast_zero.ratelimit import limit_login
 from fast_zero.schemas import Token
 from fast_zero.security import (
+    Principal,
     create_access_token,
     get_current_user,
     verify_password,
 )
+from fast_zero.settings import Settings, get_settings
 
 router = APIRouter(prefix='/auth', tags=['auth'])
 
 OAuth2Form = Annotated[OAuth2PasswordRequestForm, Depends()]
 Session = Annotated[AsyncSession, Depends(get_session)]
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
+Config = Annotated[Settings, Depends(get_settings)]
 
 
-@router.post('/token', response_model=Token)
+@router.post(
+    '/token', response_model=Token, dependencies=[Depends(limit_login)]
+)
 async def login_for_access_token(
     form_data: OAuth2Form,
     session: Session,
+    settings: Config,
 ):
-    user = await session.scalar(
-        select(User).where(User.email == form_data.username)
+    result = await session.execute(
+        select(User.email, User.password).where(
+            User.email == form_data.username
+        )
     )
+    user = result.first()
 
     if not user:
         raise HTTPException(
@@ -37,19 +47,23 @@ async def login_for_access_token(
             detail='Incorrect email or password',
         )
 
-    if not verify_password(form_data.password, user.password):
+    if not await verify_password(form_data.password, user.password):
         raise HTTPException(
             status_code=HTTPStatus.UNAUTHORIZED,
             detail='Incorrect email or password',
         )
 
-    access_token = create_access_token(data={'sub': user.email})
+    access_token = create_access_token(
+        data={'sub': user.email}, settings=settings
+    )
 
     return {'access_token': access_token, 'token_type': 'bearer'}
 
 
 @router.post('/refresh_token', response_model=Token)
-async def refresh_access_token(user: CurrentUser):
-    new_access_token = create_access_token(data={'sub': user.email})
+async def refresh_access_token(user: CurrentUser, settings: Config):
+    new_access_token = create_access_token(
+        data={'sub': user.email}, settings=settings
+    )
 
     return {'access_token': new_access_token, 'token_type': 'bearer'}
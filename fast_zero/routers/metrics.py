@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from fast_zero.metrics import registry
+
+router = APIRouter(tags=['metrics'])
+
+
+class PrometheusResponse(PlainTextResponse):
+    media_type = 'text/plain; version=0.0.4'
+
+
+@router.get(
+    '/metrics', response_class=PrometheusResponse, include_in_schema=False
+)
+async def metrics():
+    return registry.expose()
@@ -1,68 +1,462 @@
+from collections import defaultdict
+from heapq import merge
 from http import HTTPStatus
-from typing import Annotated
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from fast_zero.database import get_session
-from fast_zero.models import Todo, User
+from fast_zero.database import get_read_session, get_session
+from fast_zero.etags import (
+    cache_headers,
+    etag_matches,
+    make_etag,
+    not_modified,
+)
+from fast_zero.events import (
+    Broker,
+    Event,
+    changed,
+    event_stream,
+    get_broker,
+    todo_channel,
+)
+from fast_zero.models import Todo, TodoCount, TodoState, TodoTombstone, User
+from fast_zero.pagination import paginate, split_page
+from fast_zero.queries import TODO_PUBLIC_COLUMNS, select_public_todos
+from fast_zero.responses import FastJSONResponse
 from fast_zero.schemas import (
+    FilterChanges,
     FilterTodo,
     Message,
+    TodoBulkCreate,
+    TodoBulkDelete,
+    TodoBulkResults,
+    TodoBulkUpdate,
+    TodoChanges,
+    TodoImportSummary,
     TodoList,
     TodoPublic,
     TodoSchema,
+    TodoStats,
     TodoUpdate,
 )
-from fast_zero.security import get_current_user
+from fast_zero.search import get_todo_search
+from fast_zero.security import Principal, get_current_user
+from fast_zero.settings import Settings, get_settings
+from fast_zero.totals import todo_total
+from fast_zero.transfer import (
+    EXPORT_FORMATS,
+    import_records,
+    iter_lines,
+    parse_csv,
+    parse_ndjson,
+    stream_rows,
+)
 
 router = APIRouter(prefix='/todos', tags=['todos'])
 
 Session = Annotated[AsyncSession, Depends(get_session)]
-CurrentUser = Annotated[User, Depends(get_current_user)]
+ReadSession = Annotated[AsyncSession, Depends(get_read_session)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
+Config = Annotated[Settings, Depends(get_settings)]
+Events = Annotated[Broker, Depends(get_broker)]
 
 
 @router.post('/', status_code=HTTPStatus.CREATED, response_model=TodoPublic)
 async def create_todo(
-    current_user: CurrentUser, todo: TodoSchema, session: Session
+    current_user: CurrentUser,
+    todo: TodoSchema,
+    session: Session,
+    broker: Events,
 ):
-    db_todo = Todo(
-        description=todo.description,
-        title=todo.title,
-        state=todo.state,
-        user_id=current_user.id,
+    result = await session.execute(
+        insert(Todo)
+        .values(
+            description=todo.description,
+            title=todo.title,
+            state=todo.state,
+            user_id=current_user.id,
+        )
+        .returning(*TODO_PUBLIC_COLUMNS)
     )
-
-    session.add(db_todo)
+    db_todo = result.one()
     await session.commit()
-    await session.refresh(db_todo)
+
+    await broker.publish(
+        todo_channel(current_user.id), Event('created', db_todo._asdict())
+    )
 
     return db_todo
 
 
+def list_todos_query(user_id: int, filter: FilterTodo, dialect_name: str):
+    query = select_public_todos().where(Todo.user_id == user_id)
+
+    if filter.state:
+        query = query.filter(Todo.state == filter.state)
+
+    # Text searches are ordered by relevance, which a cursor on the
+    # primary key cannot resume; they page with offset instead.
+    ranked = filter.after is None and bool(filter.title or filter.description)
+    search = get_todo_search(dialect_name)
+    query = search(query, filter, rank=ranked)
+
+    return paginate(query, Todo.id, filter), ranked
+
+
 @router.get('/', status_code=HTTPStatus.OK, response_model=TodoList)
 async def list_todos(
+    request: Request,
     current_user: CurrentUser,
-    session: Session,
+    session: ReadSession,
+    settings: Config,
     filter: Annotated[FilterTodo, Query()],
 ):
-    query = select(Todo).where(Todo.user_id == current_user.id)
+    # The version is read before the page, so a write landing in between
+    # can only make the ETag older than the body, never a stale 304.
+    todo_version = await session.scalar(
+        select(User.todo_version).where(User.id == current_user.id)
+    )
+    etag = make_etag('todos', current_user.id, todo_version, request.url.query)
 
-    if filter.description:
-        query = query.filter(Todo.description.contains(filter.description))
+    if etag_matches(request, etag):
+        return not_modified(etag)
 
-    if filter.title:
-        query = query.filter(Todo.title.contains(filter.title))
+    dialect_name = session.bind.dialect.name
+    query, ranked = list_todos_query(current_user.id, filter, dialect_name)
 
-    if filter.state:
-        query = query.filter(Todo.state == filter.state)
+    rows = await session.execute(query)
+    todos, next_cursor = split_page(rows, filter)
+    total = total_is_exact = None
+
+    if filter.include_total:
+        total, total_is_exact = await todo_total(
+            session, current_user.id, filter, dialect_name, settings
+        )
+
+    return FastJSONResponse(
+        {
+            'todos': [todo._asdict() for todo in todos],
+            'next_cursor': None if ranked else next_cursor,
+            'total': total,
+            'total_is_exact': total_is_exact,
+        },
+        headers=cache_headers(etag),
+    )
+
+
+@router.get('/stats', status_code=HTTPStatus.OK, response_model=TodoStats)
+async def todo_stats(current_user: CurrentUser, session: ReadSession):
+    # Reads the trigger-maintained counters: one row per state, however
+    # many todos the user has.
+    rows = await session.execute(
+        select(TodoCount.state, TodoCount.count).where(
+            TodoCount.user_id == current_user.id
+        )
+    )
+    counts = dict(rows.all())
+    states = {state: counts.get(state, 0) for state in TodoState}
 
-    todos = await session.scalars(
-        query.offset(filter.offset).limit(filter.limit)
+    return {'total': sum(states.values()), 'states': states}
+
+
+@router.get('/changes', status_code=HTTPStatus.OK, response_model=TodoChanges)
+async def list_todo_changes(
+    current_user: CurrentUser,
+    session: ReadSession,
+    filter: Annotated[FilterChanges, Query()],
+):
+    # Every change up to the version read here is visible to the queries
+    # below, so a client that is already caught up costs one lookup. A
+    # replica that has not seen the user row yet has seen no changes either.
+    todo_version = (
+        await session.scalar(
+            select(User.todo_version).where(User.id == current_user.id)
+        )
+        or 0
     )
 
-    return {'todos': todos.all()}
+    if filter.since >= todo_version:
+        return {
+            'todos': [],
+            'deleted': [],
+            'next_since': todo_version,
+            'has_more': False,
+        }
+
+    # Both reads are range scans on (user_id, change_seq); every change
+    # has its own sequence value, so the merged page can stop anywhere.
+    changed = await session.execute(
+        select(*TODO_PUBLIC_COLUMNS, Todo.change_seq)
+        .where(
+            Todo.user_id == current_user.id,
+            Todo.change_seq > filter.since,
+        )
+        .order_by(Todo.change_seq)
+        .limit(filter.limit + 1)
+    )
+    tombstones = await session.execute(
+        select(TodoTombstone.todo_id, TodoTombstone.change_seq)
+        .where(
+            TodoTombstone.user_id == current_user.id,
+            TodoTombstone.change_seq > filter.since,
+        )
+        .order_by(TodoTombstone.change_seq)
+        .limit(filter.limit + 1)
+    )
+    changes = list(merge(changed, tombstones, key=lambda row: row.change_seq))
+    has_more = len(changes) > filter.limit
+    changes = changes[: filter.limit]
+
+    if has_more:
+        next_since = changes[-1].change_seq
+    else:
+        next_since = max([todo_version, *(row.change_seq for row in changes)])
+
+    todos, deleted = [], []
+
+    for row in changes:
+        if 'todo_id' in row._fields:
+            deleted.append(row.todo_id)
+        else:
+            todos.append(row)
+
+    return {
+        'todos': todos,
+        'deleted': deleted,
+        'next_since': next_since,
+        'has_more': has_more,
+    }
+
+
+@router.get(
+    '/stream',
+    status_code=HTTPStatus.OK,
+    response_class=StreamingResponse,
+    responses={HTTPStatus.OK: {'content': {'text/event-stream': {}}}},
+)
+async def stream_todo_events(
+    current_user: CurrentUser, broker: Events, settings: Config
+):
+    # The session is only used to authenticate; it is released before the
+    # first event is sent, so open streams hold no connections.
+    return StreamingResponse(
+        event_stream(
+            broker,
+            todo_channel(current_user.id),
+            heartbeat=settings.EVENT_STREAM_HEARTBEAT,
+        ),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+@router.get(
+    '/export',
+    status_code=HTTPStatus.OK,
+    response_class=StreamingResponse,
+    responses={
+        HTTPStatus.OK: {
+            'content': {'application/x-ndjson': {}, 'text/csv': {}},
+        }
+    },
+)
+async def export_todos(
+    current_user: CurrentUser,
+    session: Session,
+    settings: Config,
+    format: Literal['ndjson', 'csv'] = 'ndjson',
+):
+    media_type, *_ = EXPORT_FORMATS[format]
+    query = (
+        select_public_todos()
+        .where(Todo.user_id == current_user.id)
+        .order_by(Todo.id)
+    )
+
+    return StreamingResponse(
+        stream_rows(session.bind, query, format, settings.EXPORT_FETCH_SIZE),
+        media_type=media_type,
+        headers={
+            'Content-Disposition': f'attachment; filename="todos.{format}"'
+        },
+    )
+
+
+@router.post(
+    '/import',
+    status_code=HTTPStatus.CREATED,
+    response_model=TodoImportSummary,
+    openapi_extra={
+        'requestBody': {
+            'content': {'application/x-ndjson': {}, 'text/csv': {}},
+            'required': True,
+        }
+    },
+)
+async def import_todos(  # noqa: PLR0913, PLR0917
+    request: Request,
+    current_user: CurrentUser,
+    session: Session,
+    settings: Config,
+    broker: Events,
+    format: Literal['ndjson', 'csv'] = 'ndjson',
+):
+    # The body is read as it arrives rather than parsed up front, so only
+    # the current line and one insert batch are held in memory.
+    lines = iter_lines(request.stream(), settings.IMPORT_MAX_LINE_BYTES)
+    records = (
+        parse_csv(lines, settings.IMPORT_MAX_LINE_BYTES)
+        if format == 'csv'
+        else parse_ndjson(lines)
+    )
+
+    return await import_records(
+        session,
+        records,
+        user_id=current_user.id,
+        settings=settings,
+        broker=broker,
+    )
+
+
+@router.post(
+    '/bulk', status_code=HTTPStatus.CREATED, response_model=TodoBulkResults
+)
+async def create_todos_bulk(
+    current_user: CurrentUser,
+    payload: TodoBulkCreate,
+    session: Session,
+    broker: Events,
+):
+    # A single multi-row INSERT ... RETURNING. Ids are handed out in VALUES
+    # order, so sorting by id lines the rows up with the request items
+    # without paying for sort_by_parameter_order's row-at-a-time fallback.
+    todos = await session.execute(
+        insert(Todo).returning(*TODO_PUBLIC_COLUMNS),
+        [
+            {**todo.model_dump(), 'user_id': current_user.id}
+            for todo in payload.todos
+        ],
+    )
+    todos = sorted(todos, key=lambda todo: todo.id)
+    await session.commit()
+
+    await broker.publish(todo_channel(current_user.id), changed(len(todos)))
+
+    return {
+        'results': [
+            {'id': todo.id, 'status': 'created', 'todo': todo}
+            for todo in todos
+        ]
+    }
+
+
+@router.patch(
+    '/bulk', status_code=HTTPStatus.OK, response_model=TodoBulkResults
+)
+async def patch_todos_bulk(
+    current_user: CurrentUser,
+    payload: TodoBulkUpdate,
+    session: Session,
+    broker: Events,
+):
+    invalid = {}
+    groups = defaultdict(list)
+
+    for item in payload.todos:
+        changes = item.model_dump(exclude_unset=True, exclude={'id'})
+
+        # Every patchable column is NOT NULL; an explicit null fails that
+        # item alone instead of the whole statement.
+        if nulls := [key for key, value in changes.items() if value is None]:
+            invalid[item.id] = f'{", ".join(nulls)} cannot be null'
+        elif changes:
+            groups[frozenset(changes)].append({**changes, 'id': item.id})
+
+    # One executemany UPDATE per distinct set of changed columns, so a
+    # batch costs a statement per shape of patch rather than per item. The
+    # rows are read back below, so loaded objects need no synchronizing.
+    for rows in groups.values():
+        await session.execute(
+            update(Todo)
+            .where(Todo.user_id == current_user.id)
+            .execution_options(synchronize_session=None),
+            rows,
+        )
+
+    result = await session.execute(
+        select_public_todos().where(
+            Todo.id.in_({item.id for item in payload.todos}),
+            Todo.user_id == current_user.id,
+        )
+    )
+    todos_by_id = {todo.id: todo for todo in result}
+    await session.commit()
+
+    updated = sum(
+        1
+        for item in payload.todos
+        if item.id in todos_by_id and item.id not in invalid
+    )
+
+    if updated:
+        await broker.publish(todo_channel(current_user.id), changed(updated))
+
+    return {
+        'results': [
+            {'id': item.id, 'status': 'not_found'}
+            if item.id not in todos_by_id
+            else {
+                'id': item.id,
+                'status': 'invalid',
+                'detail': invalid[item.id],
+            }
+            if item.id in invalid
+            else {
+                'id': item.id,
+                'status': 'updated',
+                'todo': todos_by_id[item.id],
+            }
+            for item in payload.todos
+        ]
+    }
+
+
+@router.delete(
+    '/bulk', status_code=HTTPStatus.OK, response_model=TodoBulkResults
+)
+async def delete_todos_bulk(
+    current_user: CurrentUser,
+    payload: TodoBulkDelete,
+    session: Session,
+    broker: Events,
+):
+    deleted = await session.scalars(
+        delete(Todo)
+        .where(Todo.id.in_(payload.ids), Todo.user_id == current_user.id)
+        .returning(Todo.id)
+    )
+    deleted = set(deleted)
+    await session.commit()
+
+    if deleted:
+        await broker.publish(
+            todo_channel(current_user.id), changed(len(deleted))
+        )
+
+    return {
+        'results': [
+            {
+                'id': todo_id,
+                'status': 'deleted' if todo_id in deleted else 'not_found',
+            }
+            for todo_id in payload.ids
+        ]
+    }
 
 
 @router.patch(
@@ -73,10 +467,19 @@ async def patch_todo(
     current_user: CurrentUser,
     session: Session,
     todo: TodoUpdate,
+    broker: Events,
 ):
-    todo_db = await session.scalar(
-        select(Todo).where(Todo.id == todo_id, Todo.user_id == current_user.id)
+    changes = todo.model_dump(exclude_unset=True)
+    query = (
+        update(Todo).values(**changes).returning(*TODO_PUBLIC_COLUMNS)
+        if changes
+        else select_public_todos()
+    )
+
+    result = await session.execute(
+        query.where(Todo.id == todo_id, Todo.user_id == current_user.id)
     )
+    todo_db = result.first()
 
     if not todo_db:
         raise HTTPException(
@@ -84,31 +487,37 @@ async def patch_todo(
             detail='Task not found.'
         )
 
-    for key, value in todo.model_dump(exclude_unset=True).items():
-        setattr(todo_db, key, value)
-
-    session.add(todo_db)
     await session.commit()
-    await session.refresh(todo_db)
+
+    if changes:
+        await broker.publish(
+            todo_channel(current_user.id),
+            Event('updated', todo_db._asdict()),
+        )
 
     return todo_db
 
 
 @router.delete('/{todo_id}', status_code=HTTPStatus.OK, response_model=Message)
 async def delete_todo(
-    session: Session, current_user: CurrentUser, todo_id: int
+    session: Session, current_user: CurrentUser, todo_id: int, broker: Events
 ):
-    todo_db = await session.scalar(
-        select(Todo).where(Todo.id == todo_id, Todo.user_id == current_user.id)
+    deleted = await session.scalar(
+        delete(Todo)
+        .where(Todo.id == todo_id, Todo.user_id == current_user.id)
+        .returning(Todo.id)
     )
 
-    if not todo_db:
+    if not deleted:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
             detail='Task not found.'
         )
 
-    await session.delete(todo_db)
     await session.commit()
 
+    await broker.publish(
+        todo_channel(current_user.id), Event('deleted', {'id': todo_id})
+    )
+
     return {'message': 'Task has been deleted successfully.'}
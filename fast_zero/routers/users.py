@@ -1,13 +1,23 @@
 from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from fast_zero.database import get_session
+from fast_zero.database import get_read_session, get_session
+from fast_zero.etags import (
+    cache_headers,
+    etag_matches,
+    make_etag,
+    not_modified,
+)
 from fast_zero.models import User
+from fast_zero.pagination import paginate, split_page
+from fast_zero.queries import USER_PUBLIC_COLUMNS, select_public_users
+from fast_zero.ratelimit import limit_signup
+from fast_zero.responses import FastJSONResponse
 from fast_zero.schemas import (
     FilterPage,
     Message,
@@ -16,22 +26,31 @@ from fast_zero.schemas import (
     UserSchema,
 )
 from fast_zero.security import (
+    Principal,
     get_current_user,
     get_password_hash,
+    token_cache,
 )
 
 router = APIRouter(prefix='/users', tags=['users'])
 Session = Annotated[AsyncSession, Depends(get_session)]
-CurrentUser = Annotated[User, Depends(get_current_user)]
+ReadSession = Annotated[AsyncSession, Depends(get_read_session)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
 
 
-@router.post('/', status_code=HTTPStatus.CREATED, response_model=UserPublic)
+@router.post(
+    '/',
+    status_code=HTTPStatus.CREATED,
+    response_model=UserPublic,
+    dependencies=[Depends(limit_signup)],
+)
 async def create_user(user: UserSchema, session: Session):
-    db_user = await session.scalar(
-        select(User).where(
+    result = await session.execute(
+        select(User.username, User.email).where(
             (User.username == user.username) | (User.email == user.email)
         )
     )
+    db_user = result.first()
 
     if db_user:
         status_code = HTTPStatus.CONFLICT
@@ -47,33 +66,38 @@ async def create_user(user: UserSchema, session: Session):
                 detail='E-mail already exists',
             )
 
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash(user.password)
 
-    db_user = User(
-        username=user.username,
-        password=hashed_password,
-        email=user.email,
+    result = await session.execute(
+        insert(User)
+        .values(
+            username=user.username,
+            password=hashed_password,
+            email=user.email,
+        )
+        .returning(*USER_PUBLIC_COLUMNS)
     )
-
-    session.add(db_user)
+    db_user = result.one()
     await session.commit()
-    await session.refresh(db_user)
 
     return db_user
 
 
 @router.get('/', status_code=HTTPStatus.OK, response_model=UserList)
 async def list_users(
-    session: Session,
+    session: ReadSession,
     user_filter: Annotated[FilterPage, Query()],
 ):
-    query = await session.scalars(
-        select(User).offset(user_filter.offset).limit(user_filter.limit)
+    rows = await session.execute(
+        paginate(select_public_users(), User.id, user_filter)
     )
 
-    users = query.all()
+    users, next_cursor = split_page(rows, user_filter)
 
-    return {'users': users}
+    return FastJSONResponse({
+        'users': [user._asdict() for user in users],
+        'next_cursor': next_cursor,
+    })
 
 
 @router.put('/{user_id}', status_code=HTTPStatus.OK, response_model=UserPublic)
@@ -88,22 +112,38 @@ async def update_user(
             status_code=HTTPStatus.FORBIDDEN, detail='Not enough permissions'
         )
 
-    try:
-        current_user.email = user.email
-        current_user.username = user.username
-        current_user.password = get_password_hash(user.password)
+    hashed_password = await get_password_hash(user.password)
 
+    try:
+        result = await session.execute(
+            update(User)
+            .where(User.id == current_user.id)
+            .values(
+                email=user.email,
+                username=user.username,
+                password=hashed_password,
+            )
+            .returning(*USER_PUBLIC_COLUMNS)
+        )
+        db_user = result.first()
         await session.commit()
-        await session.refresh(current_user)
-
-        return current_user
 
     except IntegrityError:
+        await session.rollback()
         raise HTTPException(
             status_code=HTTPStatus.CONFLICT,
             detail='Username or Email already exists',
         )
 
+    token_cache.invalidate_user(current_user.id)
+
+    if not db_user:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND, detail='User not found'
+        )
+
+    return db_user
+
 
 @router.delete('/{user_id}', status_code=HTTPStatus.OK, response_model=Message)
 async def delete_user(
@@ -116,19 +156,43 @@ async def delete_user(
             status_code=HTTPStatus.FORBIDDEN, detail='Not enough permissions'
         )
 
-    await session.delete(current_user)
+    # todos.user_id is ON DELETE CASCADE, so the database removes the todos
+    # itself instead of the ORM loading and deleting them one by one.
+    await session.execute(delete(User).where(User.id == current_user.id))
     await session.commit()
+    token_cache.invalidate_user(current_user.id)
 
     return {'message': 'User deleted!'}
 
 
 @router.get('/{user_id}', status_code=HTTPStatus.OK, response_model=UserPublic)
-async def find_user(user_id: int, session: Session):
-    db_user = await session.scalar(select(User).where((User.id == user_id)))
+async def find_user(
+    user_id: int, request: Request, response: Response, session: ReadSession
+):
+    # A revalidation only needs the version to answer 304.
+    if 'if-none-match' in request.headers:
+        version = await session.scalar(
+            select(User.version).where(User.id == user_id)
+        )
+        etag = make_etag('user', user_id, version)
+
+        if version is not None and etag_matches(request, etag):
+            return not_modified(etag)
+
+    result = await session.execute(
+        select_public_users()
+        .add_columns(User.version)
+        .where(User.id == user_id)
+    )
+    db_user = result.first()
 
     if not db_user:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail='User not found'
         )
 
+    response.headers.update(
+        cache_headers(make_etag('user', user_id, db_user.version))
+    )
+
     return db_user
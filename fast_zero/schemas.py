@@ -1,6 +1,25 @@
-from pydantic import BaseModel, ConfigDict, EmailStr, Field
+from typing import Annotated, Literal
+
+from pydantic import (
+    BaseModel,
+    BeforeValidator,
+    ConfigDict,
+    EmailStr,
+    Field,
+    WithJsonSchema,
+)
 
 from fast_zero.models import TodoState
+from fast_zero.pagination import decode_cursor
+
+MAX_PAGE_SIZE = 100
+MAX_BULK_ITEMS = 500
+
+Cursor = Annotated[
+    int | None,
+    BeforeValidator(decode_cursor),
+    WithJsonSchema({'type': 'string'}),
+]
 
 
 class Message(BaseModel):
@@ -26,6 +45,7 @@ class UserDB(UserSchema):
 
 class UserList(BaseModel):
     users: list[UserPublic]
+    next_cursor: str | None = None
 
 
 class Token(BaseModel):
@@ -35,7 +55,8 @@ class Token(BaseModel):
 
 class FilterPage(BaseModel):
     offset: int = Field(0, ge=0)
-    limit: int = Field(100, ge=1)
+    limit: int = Field(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+    after: Cursor = None
 
 
 class TodoSchema(BaseModel):
@@ -50,15 +71,76 @@ class TodoPublic(TodoSchema):
 
 class TodoList(BaseModel):
     todos: list[TodoPublic]
+    next_cursor: str | None = None
+    total: int | None = None
+    total_is_exact: bool | None = None
+
+
+class TodoStats(BaseModel):
+    total: int
+    states: dict[TodoState, int]
 
 
 class FilterTodo(FilterPage):
     title: str | None = Field(None, min_length=3, max_length=20)
     description: str | None = Field(None, min_length=3, max_length=20)
     state: TodoState | None = None
+    include_total: bool = False
+
+
+class FilterChanges(BaseModel):
+    since: int = Field(0, ge=0)
+    limit: int = Field(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+
+
+class TodoChanges(BaseModel):
+    todos: list[TodoPublic]
+    deleted: list[int]
+    next_since: int
+    has_more: bool
 
 
 class TodoUpdate(BaseModel):
     title: str | None = None
     description: str | None = None
     state: TodoState | None = None
+
+
+class TodoBulkCreate(BaseModel):
+    todos: list[TodoSchema] = Field(min_length=1, max_length=MAX_BULK_ITEMS)
+
+
+class TodoBulkUpdateItem(TodoUpdate):
+    id: int
+
+
+class TodoBulkUpdate(BaseModel):
+    todos: list[TodoBulkUpdateItem] = Field(
+        min_length=1, max_length=MAX_BULK_ITEMS
+    )
+
+
+class TodoBulkDelete(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=MAX_BULK_ITEMS)
+
+
+class TodoBulkResult(BaseModel):
+    id: int
+    status: Literal['created', 'updated', 'deleted', 'not_found', 'invalid']
+    todo: TodoPublic | None = None
+    detail: str | None = None
+
+
+class TodoBulkResults(BaseModel):
+    results: list[TodoBulkResult]
+
+
+class TodoImportError(BaseModel):
+    line: int
+    detail: str
+
+
+class TodoImportSummary(BaseModel):
+    accepted: int
+    rejected: int
+    errors: list[TodoImportError]
@@ -0,0 +1,81 @@
+from typing import Protocol
+
+from sqlalchemy import Select, column, func, literal_column, table
+
+from fast_zero.models import Todo
+from fast_zero.schemas import FilterTodo
+
+todos_fts = table('todos_fts', column('rowid'), column('rank'))
+
+
+class TodoSearch(Protocol):
+    def __call__(
+        self, query: Select, filter: FilterTodo, *, rank: bool
+    ) -> Select: ...
+
+
+def like_search(query, filter, *, rank):
+    if filter.title:
+        query = query.where(Todo.title.contains(filter.title))
+
+    if filter.description:
+        query = query.where(Todo.description.contains(filter.description))
+
+    return query
+
+
+def _fts_phrase(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def sqlite_search(query, filter, *, rank):
+    terms = []
+
+    if filter.title:
+        terms.append(f'title : {_fts_phrase(filter.title)}')
+
+    if filter.description:
+        terms.append(f'description : {_fts_phrase(filter.description)}')
+
+    if not terms:
+        return query
+
+    query = query.join(todos_fts, todos_fts.c.rowid == Todo.id).where(
+        literal_column('todos_fts').op('MATCH')(' AND '.join(terms))
+    )
+
+    if rank:
+        query = query.order_by(todos_fts.c.rank)
+
+    return query
+
+
+def postgres_search(query, filter, *, rank):
+    scores = []
+
+    if filter.title:
+        query = query.where(
+            Todo.title.icontains(filter.title, autoescape=True)
+        )
+        scores.append(func.similarity(Todo.title, filter.title))
+
+    if filter.description:
+        query = query.where(
+            Todo.description.icontains(filter.description, autoescape=True)
+        )
+        scores.append(func.similarity(Todo.description, filter.description))
+
+    if rank and scores:
+        query = query.order_by(func.greatest(*scores).desc())
+
+    return query
+
+
+_backends: dict[str, TodoSearch] = {
+    'sqlite': sqlite_search,
+    'postgresql': postgres_search,
+}
+
+
+def get_todo_search(dialect_name: str) -> TodoSearch:
+    return _backends.get(dialect_name, like_search)
@@ -1,5 +1,13 @@
+import asyncio
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from http import HTTPStatus
+from time import perf_counter
 from zoneinfo import ZoneInfo
 
 from fastapi import Depends, HTTPException
@@ -9,28 +17,49 @@ from pwdlib import PasswordHash
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from fast_zero.cache import TokenCache
 from fast_zero.database import get_session
+from fast_zero.metrics import jwt_validation_failures, password_hash_duration
 from fast_zero.models import User
-from fast_zero.settings import Settings
+from fast_zero.settings import Settings, get_settings
 
-settings = Settings()
 pwd_context = PasswordHash.recommended()
+token_cache = TokenCache(maxsize=get_settings().TOKEN_CACHE_MAXSIZE)
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl='auth/token',
     refreshUrl='auth/refresh',
 )
 
 
+_invalid_token = jwt_validation_failures.labels('invalid')
+_expired_token = jwt_validation_failures.labels('expired')
+_missing_subject = jwt_validation_failures.labels('missing_subject')
+_unknown_subject = jwt_validation_failures.labels('unknown_subject')
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    id: int
+    username: str
+    email: str
+
+
 async def get_current_user(
     session: AsyncSession = Depends(get_session),
     token: str = Depends(oauth2_scheme),
-):
+    settings: Settings = Depends(get_settings),
+) -> Principal:
     credentials_exception = HTTPException(
         status_code=HTTPStatus.UNAUTHORIZED,
         detail='Could not validate credentials',
         headers={'WWW-Authenticate': 'Bearer'},
     )
 
+    principal = token_cache.get(token)
+
+    if principal is not None:
+        return principal
+
     try:
         payload = decode(
             token,
@@ -40,25 +69,50 @@ async def get_current_user(
         subject_email = payload.get('sub')
 
         if not subject_email:
+            _missing_subject.inc()
             raise credentials_exception
 
-    except DecodeError:
+    except ExpiredSignatureError:
+        _expired_token.inc()
         raise credentials_exception
 
-    except ExpiredSignatureError:
+    except DecodeError:
+        _invalid_token.inc()
         raise credentials_exception
 
-    user = await session.scalar(
-        select(User).where(User.email == subject_email)
+    # Read before the lookup: an update or delete of the user committed
+    # while it is awaited must not have its stale principal cached.
+    generation = token_cache.generation
+
+    # Only the columns needed to identify the caller are selected, so no
+    # ORM entity (nor its relationships) is loaded on the auth hot path.
+    result = await session.execute(
+        select(User.id, User.username, User.email).where(
+            User.email == subject_email
+        )
     )
+    row = result.first()
 
-    if not user:
+    if not row:
+        _unknown_subject.inc()
         raise credentials_exception
 
-    return user
+    principal = Principal(*row)
 
+    if 'exp' in payload:
+        token_cache.set(
+            token,
+            principal,
+            user_id=principal.id,
+            expires_at=payload['exp'],
+            generation=generation,
+        )
+
+    return principal
 
-def create_access_token(data: dict):
+
+def create_access_token(data: dict, settings: Settings | None = None):
+    settings = settings or get_settings()
     to_encode = data.copy()
     expire = datetime.now(tz=ZoneInfo('UTC')) + timedelta(
         minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
@@ -73,9 +127,120 @@ def create_access_token(data: dict):
     return encoded_jwt
 
 
-def get_password_hash(password: str):
+def _timed(func, *args):
+    start = perf_counter()
+    result = func(*args)
+
+    return result, perf_counter() - start
+
+
+def _hash(password: str):
     return pwd_context.hash(password)
 
 
-def verify_password(plain_password: str, hashed_password: str):
+def _verify(plain_password: str, hashed_password: str):
     return pwd_context.verify(plain_password, hashed_password)
+
+
+_hash_durations = {
+    _hash: password_hash_duration.labels('hash'),
+    _verify: password_hash_duration.labels('verify'),
+}
+
+
+@dataclass
+class HashMetrics:
+    calls: int = 0
+    rejected: int = 0
+    queue_wait_seconds: float = 0.0
+    hash_seconds: float = 0.0
+
+
+class PasswordHasher:
+    def __init__(
+        self,
+        *,
+        executor: str = 'thread',
+        workers: int = 4,
+        max_pending: int = 64,
+        retry_after: int = 1,
+    ):
+        self.executor = executor
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self.pending = 0
+        self.metrics = HashMetrics()
+        self._pool: Executor | None = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings):
+        return cls(
+            executor=settings.PASSWORD_HASH_EXECUTOR,
+            workers=settings.PASSWORD_HASH_WORKERS,
+            max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+            retry_after=settings.PASSWORD_HASH_RETRY_AFTER,
+        )
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            pool_class = (
+                ProcessPoolExecutor
+                if self.executor == 'process'
+                else ThreadPoolExecutor
+            )
+            self._pool = pool_class(max_workers=self.workers)
+
+        return self._pool
+
+    async def _run(self, func, *args):
+        # Fail fast instead of letting requests pile up behind the pool.
+        if self.pending >= self.max_pending:
+            self.metrics.rejected += 1
+            raise HTTPException(
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                detail='Server is busy, try again later',
+                headers={'Retry-After': str(self.retry_after)},
+            )
+
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        start = perf_counter()
+
+        try:
+            result, hash_seconds = await loop.run_in_executor(
+                self._get_pool(), _timed, func, *args
+            )
+        finally:
+            self.pending -= 1
+
+        self.metrics.calls += 1
+        self.metrics.hash_seconds += hash_seconds
+        _hash_durations[func].observe(hash_seconds)
+        self.metrics.queue_wait_seconds += (
+            perf_counter() - start - hash_seconds
+        )
+
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(_verify, plain_password, hashed_password)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+password_hasher = PasswordHasher.from_settings(get_settings())
+
+
+async def get_password_hash(password: str):
+    return await password_hasher.hash(password)
+
+
+async def verify_password(plain_password: str, hashed_password: str):
+    return await password_hasher.verify(plain_password, hashed_password)
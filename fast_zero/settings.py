@@ -1,3 +1,6 @@
+from functools import lru_cache
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -10,3 +13,92 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 10.0
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_POOL_PRE_PING: bool = True
+    DATABASE_STATEMENT_TIMEOUT: int = 30_000
+
+    DATABASE_REPLICA_URLS: list[str] = []
+    DATABASE_REPLICA_RETRY_AFTER: float = 30.0
+    READ_YOUR_WRITES_WINDOW: int = 5
+
+    SQLITE_JOURNAL_MODE: str = 'WAL'
+    SQLITE_SYNCHRONOUS: str = 'NORMAL'
+    SQLITE_BUSY_TIMEOUT: int = 5_000
+    SQLITE_FOREIGN_KEYS: bool = True
+
+    SQL_INSTRUMENTATION: bool = True
+    SQL_STATEMENT_BUDGET: int = 10
+
+    PASSWORD_HASH_EXECUTOR: Literal['thread', 'process'] = 'thread'
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    PASSWORD_HASH_RETRY_AFTER: int = 1
+
+    TOKEN_CACHE_MAXSIZE: int = 10_000
+
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_STORE: Literal['memory'] = 'memory'
+    RATE_LIMIT_SWEEP_INTERVAL: float = 60.0
+    # Requests per minute, which is also the burst allowed; 0 disables.
+    RATE_LIMIT_LOGIN_PER_IP: int = 30
+    RATE_LIMIT_LOGIN_PER_ACCOUNT: int = 10
+    RATE_LIMIT_SIGNUP_PER_IP: int = 10
+
+    TODO_TOTAL_STRATEGY: Literal['exact', 'sampled'] = 'sampled'
+    TODO_TOTAL_EXACT_THRESHOLD: int = 10_000
+    TODO_TOTAL_SAMPLE_SIZE: int = 1_000
+
+    EXPORT_FETCH_SIZE: int = 1_000
+    IMPORT_BATCH_SIZE: int = 500
+    IMPORT_MAX_LINE_BYTES: int = 64 * 1024
+    IMPORT_MAX_ERRORS: int = 100
+
+    EVENT_BROKER: Literal['memory'] = 'memory'
+    EVENT_QUEUE_SIZE: int = 100
+    EVENT_STREAM_HEARTBEAT: float = 15.0
+
+    METRICS_ENABLED: bool = True
+    METRICS_LATENCY_BUCKETS: tuple[float, ...] = (
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+        5.0,
+        10.0,
+    )
+    METRICS_POOL_WAIT_BUCKETS: tuple[float, ...] = (
+        0.0005,
+        0.001,
+        0.005,
+        0.01,
+        0.05,
+        0.1,
+        0.5,
+        1.0,
+        5.0,
+        10.0,
+    )
+    METRICS_PASSWORD_HASH_BUCKETS: tuple[float, ...] = (
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+    )
+
+
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
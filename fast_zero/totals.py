@@ -0,0 +1,74 @@
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fast_zero.models import Todo, TodoCount
+from fast_zero.schemas import FilterTodo
+from fast_zero.search import get_todo_search
+from fast_zero.settings import Settings
+
+
+async def _counted_total(session: AsyncSession, user_id: int, state) -> int:
+    query = select(func.coalesce(func.sum(TodoCount.count), 0)).where(
+        TodoCount.user_id == user_id
+    )
+
+    if state:
+        query = query.where(TodoCount.state == state)
+
+    return await session.scalar(query)
+
+
+async def _count(session: AsyncSession, query) -> int:
+    return await session.scalar(
+        select(func.count()).select_from(query.subquery())
+    )
+
+
+async def todo_total(
+    session: AsyncSession,
+    user_id: int,
+    filter: FilterTodo,
+    dialect_name: str,
+    settings: Settings,
+) -> tuple[int, bool]:
+    """Return the number of todos matching filter and whether it is exact.
+
+    Unfiltered (or state-only) totals come straight from the counter
+    table. Text searches are counted exactly while the user has at most
+    TODO_TOTAL_EXACT_THRESHOLD (or TODO_TOTAL_SAMPLE_SIZE) candidate todos,
+    or always under the 'exact' strategy; past that, the 'sampled'
+    strategy extrapolates from the share of the most recent
+    TODO_TOTAL_SAMPLE_SIZE todos that match.
+    """
+    candidates = await _counted_total(session, user_id, filter.state)
+
+    if not (filter.title or filter.description):
+        return candidates, True
+
+    search = get_todo_search(dialect_name)
+    owned = select(Todo.id).where(Todo.user_id == user_id)
+
+    if filter.state:
+        owned = owned.where(Todo.state == filter.state)
+
+    # A sample that would hold every candidate is the exact count anyway,
+    # and extrapolating from it would divide by rows it does not have.
+    if (
+        settings.TODO_TOTAL_STRATEGY == 'exact'
+        or candidates <= settings.TODO_TOTAL_EXACT_THRESHOLD
+        or candidates <= settings.TODO_TOTAL_SAMPLE_SIZE
+    ):
+        return await _count(session, search(owned, filter, rank=False)), True
+
+    sample_size = settings.TODO_TOTAL_SAMPLE_SIZE
+    sample = owned.order_by(Todo.id.desc()).limit(sample_size)
+    matches = await _count(
+        session,
+        search(
+            select(Todo.id).where(Todo.id.in_(sample.scalar_subquery())),
+            filter,
+            rank=False,
+        ),
+    )
+
+    return round(matches * candidates / sample_size), False
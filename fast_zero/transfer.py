@@ -0,0 +1,208 @@
+import csv
+import io
+
+from pydantic import ValidationError
+from pydantic_core import to_json
+from sqlalchemy import Select, insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from fast_zero.events import Broker, changed, todo_channel
+from fast_zero.models import Todo
+from fast_zero.schemas import TodoSchema
+from fast_zero.settings import Settings
+
+CSV_FIELDS = ('id', 'title', 'description', 'state')
+
+
+def encode_ndjson(rows) -> bytes:
+    return b''.join(to_json(row._asdict()) + b'\n' for row in rows)
+
+
+def encode_csv(rows) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        (row.id, row.title, row.description, row.state.value) for row in rows
+    )
+
+    return buffer.getvalue().encode()
+
+
+# format -> (media type, header, encoder for a batch of rows)
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', b'', encode_ndjson),
+    'csv': ('text/csv', (','.join(CSV_FIELDS) + '\r\n').encode(), encode_csv),
+}
+
+
+async def stream_rows(
+    engine: AsyncEngine, query: Select, export_format: str, fetch_size: int
+):
+    _, header, encode = EXPORT_FORMATS[export_format]
+
+    if header:
+        yield header
+
+    # The request's session is closed once the handler returns, before the
+    # body is sent, so the stream runs on a session of its own. yield_per
+    # makes it a server-side cursor read fetch_size rows at a time, and
+    # each batch goes out as a single chunk.
+    async with AsyncSession(engine) as session:
+        result = await session.stream(
+            query.execution_options(yield_per=fetch_size)
+        )
+
+        async for rows in result.partitions():
+            yield encode(rows)
+
+
+async def iter_lines(chunks, max_line_bytes: int):
+    """Split a byte stream into (line number, line) pairs.
+
+    At most one line is buffered. Lines longer than max_line_bytes are
+    discarded as they arrive and reported as None.
+    """
+    buffer = bytearray()
+    number = 0
+    overflow = False
+
+    async for chunk in chunks:
+        start = 0
+
+        while (end := chunk.find(b'\n', start)) != -1:
+            number += 1
+            overflow = overflow or len(buffer) + end - start > max_line_bytes
+            yield (
+                number,
+                None if overflow else bytes(buffer + chunk[start:end]),
+            )
+            buffer.clear()
+            overflow = False
+            start = end + 1
+
+        if not overflow:
+            buffer += chunk[start:]
+
+            if len(buffer) > max_line_bytes:
+                overflow = True
+                buffer.clear()
+
+    if buffer or overflow:
+        yield number + 1, None if overflow else bytes(buffer)
+
+
+def _describe(error: ValidationError) -> str:
+    return '; '.join(
+        f'{".".join(map(str, detail["loc"])) or "line"}: {detail["msg"]}'
+        for detail in error.errors()
+    )
+
+
+def _validate(number: int, data) -> tuple[int, TodoSchema | str]:
+    try:
+        if isinstance(data, bytes):
+            return number, TodoSchema.model_validate_json(data)
+
+        return number, TodoSchema.model_validate(data)
+    except ValidationError as error:
+        return number, _describe(error)
+
+
+async def parse_ndjson(lines):
+    async for number, line in lines:
+        if line is None:
+            yield number, 'Line too long'
+        elif line.strip():
+            yield _validate(number, line)
+
+
+async def parse_csv(lines, max_record_bytes: int):
+    header = None
+    record: list[str] = []
+    record_line = record_bytes = quotes = 0
+
+    async for number, line in lines:
+        if line is None:
+            record.clear()
+            yield number, 'Line too long'
+            continue
+
+        try:
+            text = line.decode().removesuffix('\r')
+        except UnicodeDecodeError:
+            record.clear()
+            yield number, 'Invalid UTF-8'
+            continue
+
+        if not record:
+            if not text.strip():
+                continue
+
+            record_line, record_bytes, quotes = number, 0, 0
+
+        record.append(text)
+        record_bytes += len(line)
+        quotes += text.count('"')
+
+        # Doubled quotes escape a quote, so an odd count means a quoted
+        # field is still open and the record continues on the next line.
+        if quotes % 2:
+            if record_bytes > max_record_bytes:
+                record.clear()
+                yield record_line, 'Record too long'
+
+            continue
+
+        fields = next(csv.reader(['\n'.join(record)]))
+        record.clear()
+
+        if header is None:
+            header = fields
+        else:
+            yield _validate(record_line, dict(zip(header, fields)))
+
+    if record:
+        yield record_line, 'Unterminated quoted field'
+
+
+async def import_records(
+    session: AsyncSession,
+    records,
+    *,
+    user_id: int,
+    settings: Settings,
+    broker: Broker | None = None,
+) -> dict:
+    accepted = rejected = 0
+    errors = []
+    batch = []
+
+    async def flush():
+        # One executemany INSERT per batch, committed as it goes so a
+        # large import does not hold the write lock from start to end.
+        await session.execute(insert(Todo), batch)
+        await session.commit()
+
+        if broker is not None:
+            await broker.publish(todo_channel(user_id), changed(len(batch)))
+
+        batch.clear()
+
+    async for line, todo in records:
+        if isinstance(todo, str):
+            rejected += 1
+
+            if len(errors) < settings.IMPORT_MAX_ERRORS:
+                errors.append({'line': line, 'detail': todo})
+
+            continue
+
+        batch.append({**todo.model_dump(), 'user_id': user_id})
+        accepted += 1
+
+        if len(batch) >= settings.IMPORT_BATCH_SIZE:
+            await flush()
+
+    if batch:
+        await flush()
+
+    return {'accepted': accepted, 'rejected': rejected, 'errors': errors}
@@ -7,12 +7,12 @@ from sqlalchemy import pool
 from alembic import context
 
 from fast_zero.models import table_registry
-from fast_zero.settings import Settings
+from fast_zero.settings import get_settings
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
-config.set_main_option('sqlalchemy.url', Settings().DATABASE_URL) # type: ignore
+config.set_main_option('sqlalchemy.url', get_settings().DATABASE_URL) # type: ignore
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
 if config.config_file_name is not None:
@@ -24,6 +24,16 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = table_registry.metadata
 
+
+def include_name(name, type_, parent_names):
+    # FTS5 virtual tables (and their shadow tables) are managed by hand in
+    # the migrations, so autogenerate must not try to drop them.
+    if type_ == 'table':
+        return not name.startswith('todos_fts')
+
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -48,6 +58,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -56,7 +67,9 @@ def run_migrations_offline() -> None:
 
 def do_run_migrations(connection):
     context.configure(
-        connection=connection, target_metadata=target_metadata
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
     )
 
     with context.begin_transaction():
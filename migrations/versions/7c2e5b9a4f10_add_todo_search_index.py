@@ -0,0 +1,88 @@
+"""add todo search index
+
+Revision ID: 7c2e5b9a4f10
+Revises: d109eecae4d9
+Create Date: 2026-10-18 10:12:41.503117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e5b9a4f10'
+down_revision: Union[str, Sequence[str], None] = 'd109eecae4d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute("""
+            CREATE VIRTUAL TABLE todos_fts USING fts5(
+                title, description,
+                content='todos', content_rowid='id', tokenize='trigram'
+            )
+        """)
+        op.execute("""
+            CREATE TRIGGER todos_fts_insert AFTER INSERT ON todos
+            BEGIN
+                INSERT INTO todos_fts (rowid, title, description)
+                VALUES (new.id, new.title, new.description);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER todos_fts_delete AFTER DELETE ON todos
+            BEGIN
+                INSERT INTO todos_fts (todos_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER todos_fts_update
+            AFTER UPDATE OF title, description ON todos
+            BEGIN
+                INSERT INTO todos_fts (todos_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+                INSERT INTO todos_fts (rowid, title, description)
+                VALUES (new.id, new.title, new.description);
+            END
+        """)
+        op.execute("INSERT INTO todos_fts (todos_fts) VALUES ('rebuild')")
+
+    elif dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.create_index(
+            'ix_todos_title_trgm',
+            'todos',
+            ['title'],
+            postgresql_using='gin',
+            postgresql_ops={'title': 'gin_trgm_ops'},
+        )
+        op.create_index(
+            'ix_todos_description_trgm',
+            'todos',
+            ['description'],
+            postgresql_using='gin',
+            postgresql_ops={'description': 'gin_trgm_ops'},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute('DROP TRIGGER IF EXISTS todos_fts_update')
+        op.execute('DROP TRIGGER IF EXISTS todos_fts_delete')
+        op.execute('DROP TRIGGER IF EXISTS todos_fts_insert')
+        op.execute('DROP TABLE IF EXISTS todos_fts')
+
+    elif dialect == 'postgresql':
+        op.drop_index('ix_todos_description_trgm', table_name='todos')
+        op.drop_index('ix_todos_title_trgm', table_name='todos')
@@ -0,0 +1,129 @@
+"""add resource versions
+
+Revision ID: a4f8c2e61d39
+Revises: e5a9c3d1f7b2
+Create Date: 2026-10-18 23:02:37.118406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4f8c2e61d39'
+down_revision: Union[str, Sequence[str], None] = 'e5a9c3d1f7b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+sqlite_triggers = [
+    """
+    CREATE TRIGGER users_version_update
+    AFTER UPDATE OF username, email, password ON users
+    BEGIN
+        UPDATE users SET version = version + 1 WHERE id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER todos_version_insert AFTER INSERT ON todos
+    BEGIN
+        UPDATE users SET todo_version = todo_version + 1
+        WHERE id = new.user_id;
+    END
+    """,
+    """
+    CREATE TRIGGER todos_version_delete AFTER DELETE ON todos
+    BEGIN
+        UPDATE users SET todo_version = todo_version + 1
+        WHERE id = old.user_id;
+    END
+    """,
+    """
+    CREATE TRIGGER todos_version_update
+    AFTER UPDATE OF title, description, state, user_id ON todos
+    BEGIN
+        UPDATE users SET todo_version = todo_version + 1
+        WHERE id IN (old.user_id, new.user_id);
+    END
+    """,
+]
+
+postgresql_triggers = [
+    """
+    CREATE OR REPLACE FUNCTION users_bump_version() RETURNS trigger AS $$
+    BEGIN
+        NEW.version := OLD.version + 1;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER users_version_update
+    BEFORE UPDATE OF username, email, password ON users
+    FOR EACH ROW EXECUTE FUNCTION users_bump_version()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION todos_bump_version() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            UPDATE users SET todo_version = todo_version + 1
+            WHERE id = OLD.user_id;
+        END IF;
+
+        IF TG_OP = 'INSERT'
+            OR (TG_OP = 'UPDATE' AND NEW.user_id <> OLD.user_id) THEN
+            UPDATE users SET todo_version = todo_version + 1
+            WHERE id = NEW.user_id;
+        END IF;
+
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER todos_version
+    AFTER INSERT OR DELETE
+    OR UPDATE OF title, description, state, user_id ON todos
+    FOR EACH ROW EXECUTE FUNCTION todos_bump_version()
+    """,
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    op.add_column('users', sa.Column(
+        'version', sa.Integer(), server_default='0', nullable=False
+    ))
+    op.add_column('users', sa.Column(
+        'todo_version', sa.Integer(), server_default='0', nullable=False
+    ))
+
+    triggers = {
+        'sqlite': sqlite_triggers,
+        'postgresql': postgresql_triggers,
+    }.get(dialect, [])
+
+    for trigger in triggers:
+        op.execute(trigger)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute('DROP TRIGGER IF EXISTS todos_version_update')
+        op.execute('DROP TRIGGER IF EXISTS todos_version_delete')
+        op.execute('DROP TRIGGER IF EXISTS todos_version_insert')
+        op.execute('DROP TRIGGER IF EXISTS users_version_update')
+
+    elif dialect == 'postgresql':
+        op.execute('DROP FUNCTION IF EXISTS todos_bump_version() CASCADE')
+        op.execute('DROP FUNCTION IF EXISTS users_bump_version() CASCADE')
+
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('todo_version')
+        batch_op.drop_column('version')
@@ -0,0 +1,87 @@
+"""cascade todo deletes
+
+Revision ID: b3d41f6e8a27
+Revises: 4912185205ba
+Create Date: 2026-10-18 21:07:32.118406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d41f6e8a27'
+down_revision: Union[str, Sequence[str], None] = '4912185205ba'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The original foreign key was created unnamed; this lets batch mode find
+# it on SQLite. PostgreSQL named it todos_user_id_fkey.
+naming_convention = {
+    'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s',
+}
+
+fts_triggers = [
+    """
+    CREATE TRIGGER IF NOT EXISTS todos_fts_insert AFTER INSERT ON todos
+    BEGIN
+        INSERT INTO todos_fts (rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS todos_fts_delete AFTER DELETE ON todos
+    BEGIN
+        INSERT INTO todos_fts (todos_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS todos_fts_update
+    AFTER UPDATE OF title, description ON todos
+    BEGIN
+        INSERT INTO todos_fts (todos_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO todos_fts (rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+]
+
+
+def _replace_foreign_key(ondelete):
+    dialect = op.get_bind().dialect.name
+    current_name = (
+        'todos_user_id_fkey'
+        if dialect == 'postgresql'
+        else 'fk_todos_user_id_users'
+    )
+
+    with op.batch_alter_table(
+        'todos', naming_convention=naming_convention
+    ) as batch_op:
+        batch_op.drop_constraint(current_name, type_='foreignkey')
+        batch_op.create_foreign_key(
+            'fk_todos_user_id_users',
+            'users',
+            ['user_id'],
+            ['id'],
+            ondelete=ondelete,
+        )
+
+    # SQLite rebuilds the table in batch mode, which drops its triggers.
+    if dialect == 'sqlite':
+        for trigger in fts_triggers:
+            op.execute(trigger)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _replace_foreign_key('CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _replace_foreign_key(None)
@@ -0,0 +1,221 @@
+"""add todo change feed
+
+Revision ID: c8d2a7f4b915
+Revises: a4f8c2e61d39
+Create Date: 2026-10-18 23:41:09.562213
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8d2a7f4b915'
+down_revision: Union[str, Sequence[str], None] = 'a4f8c2e61d39'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+sqlite_triggers = [
+    """
+    CREATE TRIGGER todos_version_insert AFTER INSERT ON todos
+    BEGIN
+        UPDATE users SET todo_version = todo_version + 1
+        WHERE id = new.user_id;
+        UPDATE todos SET change_seq = (
+            SELECT todo_version FROM users WHERE id = new.user_id
+        ) WHERE id = new.id;
+        DELETE FROM todo_tombstones WHERE todo_id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER todos_version_delete AFTER DELETE ON todos
+    BEGIN
+        UPDATE users SET todo_version = todo_version + 1
+        WHERE id = old.user_id;
+        INSERT INTO todo_tombstones (todo_id, user_id, change_seq)
+        SELECT old.id, id, todo_version FROM users WHERE id = old.user_id
+        ON CONFLICT (todo_id) DO UPDATE SET
+            user_id = excluded.user_id, change_seq = excluded.change_seq;
+    END
+    """,
+    """
+    CREATE TRIGGER todos_version_update
+    AFTER UPDATE OF title, description, state, user_id ON todos
+    BEGIN
+        UPDATE users SET todo_version = todo_version + 1
+        WHERE id IN (old.user_id, new.user_id);
+        INSERT INTO todo_tombstones (todo_id, user_id, change_seq)
+        SELECT old.id, id, todo_version FROM users
+        WHERE id = old.user_id AND old.user_id <> new.user_id
+        ON CONFLICT (todo_id) DO UPDATE SET
+            user_id = excluded.user_id, change_seq = excluded.change_seq;
+        UPDATE todos SET change_seq = (
+            SELECT todo_version FROM users WHERE id = new.user_id
+        ) WHERE id = new.id;
+    END
+    """,
+]
+
+# The previous revision's triggers, restored on downgrade.
+sqlite_version_triggers = [
+    """
+    CREATE TRIGGER todos_version_insert AFTER INSERT ON todos
+    BEGIN
+        UPDATE users SET todo_version = todo_version + 1
+        WHERE id = new.user_id;
+    END
+    """,
+    """
+    CREATE TRIGGER todos_version_delete AFTER DELETE ON todos
+    BEGIN
+        UPDATE users SET todo_version = todo_version + 1
+        WHERE id = old.user_id;
+    END
+    """,
+    """
+    CREATE TRIGGER todos_version_update
+    AFTER UPDATE OF title, description, state, user_id ON todos
+    BEGIN
+        UPDATE users SET todo_version = todo_version + 1
+        WHERE id IN (old.user_id, new.user_id);
+    END
+    """,
+]
+
+postgresql_triggers = [
+    """
+    CREATE OR REPLACE FUNCTION todos_bump_version() RETURNS trigger AS $$
+    DECLARE
+        seq integer;
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            UPDATE users SET todo_version = todo_version + 1
+            WHERE id = OLD.user_id
+            RETURNING todo_version INTO seq;
+
+            IF FOUND AND (TG_OP = 'DELETE'
+                OR NEW.user_id <> OLD.user_id) THEN
+                INSERT INTO todo_tombstones (todo_id, user_id, change_seq)
+                VALUES (OLD.id, OLD.user_id, seq)
+                ON CONFLICT (todo_id) DO UPDATE SET
+                    user_id = excluded.user_id,
+                    change_seq = excluded.change_seq;
+            END IF;
+        END IF;
+
+        IF TG_OP = 'DELETE' THEN
+            RETURN OLD;
+        END IF;
+
+        IF TG_OP = 'INSERT' OR NEW.user_id <> OLD.user_id THEN
+            UPDATE users SET todo_version = todo_version + 1
+            WHERE id = NEW.user_id
+            RETURNING todo_version INTO seq;
+        END IF;
+
+        NEW.change_seq := seq;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER todos_version
+    BEFORE INSERT OR DELETE
+    OR UPDATE OF title, description, state, user_id ON todos
+    FOR EACH ROW EXECUTE FUNCTION todos_bump_version()
+    """,
+]
+
+postgresql_version_triggers = [
+    """
+    CREATE OR REPLACE FUNCTION todos_bump_version() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            UPDATE users SET todo_version = todo_version + 1
+            WHERE id = OLD.user_id;
+        END IF;
+
+        IF TG_OP = 'INSERT'
+            OR (TG_OP = 'UPDATE' AND NEW.user_id <> OLD.user_id) THEN
+            UPDATE users SET todo_version = todo_version + 1
+            WHERE id = NEW.user_id;
+        END IF;
+
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER todos_version
+    AFTER INSERT OR DELETE
+    OR UPDATE OF title, description, state, user_id ON todos
+    FOR EACH ROW EXECUTE FUNCTION todos_bump_version()
+    """,
+]
+
+
+def _drop_version_triggers(dialect):
+    if dialect == 'sqlite':
+        op.execute('DROP TRIGGER IF EXISTS todos_version_update')
+        op.execute('DROP TRIGGER IF EXISTS todos_version_delete')
+        op.execute('DROP TRIGGER IF EXISTS todos_version_insert')
+
+    elif dialect == 'postgresql':
+        op.execute('DROP TRIGGER IF EXISTS todos_version ON todos')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    op.create_table('todo_tombstones',
+    sa.Column('todo_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('change_seq', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('todo_id')
+    )
+    op.create_index('ix_todo_tombstones_user_id_change_seq', 'todo_tombstones', ['user_id', 'change_seq'], unique=False)
+    op.add_column('todos', sa.Column(
+        'change_seq', sa.Integer(), server_default='0', nullable=False
+    ))
+
+    # Existing todos join the feed at a fresh sequence value, so a client
+    # syncing from 0 receives all of them.
+    op.execute('UPDATE users SET todo_version = todo_version + 1')
+    op.execute("""
+        UPDATE todos SET change_seq = (
+            SELECT todo_version FROM users WHERE users.id = todos.user_id
+        )
+    """)
+    op.create_index('ix_todos_user_id_change_seq', 'todos', ['user_id', 'change_seq'], unique=False)
+
+    _drop_version_triggers(dialect)
+    triggers = {
+        'sqlite': sqlite_triggers,
+        'postgresql': postgresql_triggers,
+    }.get(dialect, [])
+
+    for trigger in triggers:
+        op.execute(trigger)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    _drop_version_triggers(dialect)
+    triggers = {
+        'sqlite': sqlite_version_triggers,
+        'postgresql': postgresql_version_triggers,
+    }.get(dialect, [])
+
+    for trigger in triggers:
+        op.execute(trigger)
+
+    op.drop_index('ix_todos_user_id_change_seq', table_name='todos')
+    op.drop_column('todos', 'change_seq')
+    op.drop_index('ix_todo_tombstones_user_id_change_seq', table_name='todo_tombstones')
+    op.drop_table('todo_tombstones')
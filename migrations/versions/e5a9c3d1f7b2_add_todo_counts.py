@@ -0,0 +1,126 @@
+"""add todo counts
+
+Revision ID: e5a9c3d1f7b2
+Revises: b3d41f6e8a27
+Create Date: 2026-10-18 22:14:05.271934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a9c3d1f7b2'
+down_revision: Union[str, Sequence[str], None] = 'b3d41f6e8a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+sqlite_triggers = [
+    """
+    CREATE TRIGGER todo_counts_insert AFTER INSERT ON todos
+    BEGIN
+        INSERT INTO todo_counts (user_id, state, count)
+        VALUES (new.user_id, new.state, 1)
+        ON CONFLICT (user_id, state) DO UPDATE SET count = count + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER todo_counts_delete AFTER DELETE ON todos
+    BEGIN
+        UPDATE todo_counts SET count = count - 1
+        WHERE user_id = old.user_id AND state = old.state;
+    END
+    """,
+    """
+    CREATE TRIGGER todo_counts_update
+    AFTER UPDATE OF state, user_id ON todos
+    BEGIN
+        UPDATE todo_counts SET count = count - 1
+        WHERE user_id = old.user_id AND state = old.state;
+        INSERT INTO todo_counts (user_id, state, count)
+        VALUES (new.user_id, new.state, 1)
+        ON CONFLICT (user_id, state) DO UPDATE SET count = count + 1;
+    END
+    """,
+]
+
+postgresql_triggers = [
+    """
+    CREATE OR REPLACE FUNCTION todo_counts_sync() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            UPDATE todo_counts SET count = count - 1
+            WHERE user_id = OLD.user_id AND state = OLD.state;
+        END IF;
+
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO todo_counts (user_id, state, count)
+            VALUES (NEW.user_id, NEW.state, 1)
+            ON CONFLICT (user_id, state)
+            DO UPDATE SET count = todo_counts.count + 1;
+        END IF;
+
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER todo_counts_sync
+    AFTER INSERT OR DELETE OR UPDATE OF state, user_id ON todos
+    FOR EACH ROW EXECUTE FUNCTION todo_counts_sync()
+    """,
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    state = (
+        postgresql.ENUM(name='todostate', create_type=False)
+        if dialect == 'postgresql'
+        else sa.Enum(
+            'draft', 'todo', 'doing', 'done', 'trash', name='todostate'
+        )
+    )
+
+    op.create_table('todo_counts',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('state', state, nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'state')
+    )
+
+    # Backfill before the triggers exist; both run in the migration's
+    # transaction, so no write slips in between.
+    op.execute("""
+        INSERT INTO todo_counts (user_id, state, count)
+        SELECT user_id, state, count(*) FROM todos GROUP BY user_id, state
+    """)
+
+    triggers = {
+        'sqlite': sqlite_triggers,
+        'postgresql': postgresql_triggers,
+    }.get(dialect, [])
+
+    for trigger in triggers:
+        op.execute(trigger)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute('DROP TRIGGER IF EXISTS todo_counts_update')
+        op.execute('DROP TRIGGER IF EXISTS todo_counts_delete')
+        op.execute('DROP TRIGGER IF EXISTS todo_counts_insert')
+
+    elif dialect == 'postgresql':
+        op.execute('DROP TRIGGER IF EXISTS todo_counts_sync ON todos')
+        op.execute('DROP FUNCTION IF EXISTS todo_counts_sync()')
+
+    op.drop_table('todo_counts')
@@ -1,7 +1,9 @@
 from contextlib import contextmanager
 from datetime import datetime
+from functools import partial
 
 import factory
+import factory.fuzzy
 import pytest
 import pytest_asyncio
 from fastapi.testclient import TestClient
@@ -9,9 +11,15 @@ from sqlalchemy import StaticPool, event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 
 from fast_zero.app import app
-from fast_zero.database import get_session
-from fast_zero.models import User, table_registry
-from fast_zero.security import get_password_hash
+from fast_zero.database import (
+    apply_sqlite_pragmas,
+    get_read_session,
+    get_session,
+)
+from fast_zero.instrumentation import instrument_engine
+from fast_zero.models import Todo, TodoState, User, table_registry
+from fast_zero.ratelimit import bucket_store
+from fast_zero.security import get_password_hash, token_cache
 
 
 class UserFactory(factory.Factory):
@@ -23,6 +31,16 @@ class UserFactory(factory.Factory):
     password = factory.LazyAttribute(lambda obj: f'{obj.username}@example.com')
 
 
+class TodoFactory(factory.Factory):
+    class Meta:
+        model = Todo
+
+    title = factory.Faker('text')
+    description = factory.Faker('text')
+    state = factory.fuzzy.FuzzyChoice(TodoState)
+    user_id = 1
+
+
 @pytest.fixture
 def token(client, user):
     response = client.post(
@@ -36,7 +54,7 @@ def token(client, user):
 @pytest_asyncio.fixture
 async def user(session):
     password = 'testtest'
-    user = UserFactory(password=get_password_hash(password))
+    user = UserFactory(password=await get_password_hash(password))
 
     session.add(user)
     await session.commit()
@@ -50,7 +68,7 @@ async def user(session):
 @pytest_asyncio.fixture
 async def other_user(session):
     password = 'testtest'
-    user = UserFactory(password=get_password_hash(password))
+    user = UserFactory(password=await get_password_hash(password))
 
     session.add(user)
     await session.commit()
@@ -68,9 +86,12 @@ def client(session):
 
     with TestClient(app) as client:
         app.dependency_overrides[get_session] = get_session_override
+        app.dependency_overrides[get_read_session] = get_session_override
         yield client
 
     app.dependency_overrides.clear()
+    token_cache.clear()
+    bucket_store.clear()
 
 
 @pytest_asyncio.fixture
@@ -80,6 +101,8 @@ async def session():
         connect_args={'check_same_thread': False},
         poolclass=StaticPool,
     )
+    apply_sqlite_pragmas(engine, {'foreign_keys': 'ON'})
+    instrument_engine(engine)
 
     async with engine.begin() as conn:
         await conn.run_sync(table_registry.metadata.create_all)
@@ -91,6 +114,25 @@ async def session():
         await conn.run_sync(table_registry.metadata.drop_all)
 
 
+@pytest.fixture
+def count_queries(session):
+    return partial(_count_queries, engine=session.bind.sync_engine)
+
+
+@contextmanager
+def _count_queries(*, engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+
+    yield statements
+
+    event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
 @pytest.fixture
 def mock_db_time():
     return _mock_db_time
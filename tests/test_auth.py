@@ -2,6 +2,10 @@ from http import HTTPStatus
 
 from freezegun import freeze_time
 
+from fast_zero.app import app
+from fast_zero.security import password_hasher
+from fast_zero.settings import get_settings
+
 
 def test_get_access_token_successfully(client, user):
     response = client.post(
@@ -100,3 +104,81 @@ def test_refresh_token_with_expired_access_token(client, user):
 
         assert response.status_code == HTTPStatus.UNAUTHORIZED
         assert response.json() == {'detail': 'Could not validate credentials'}
+
+
+def test_refresh_token_statement_count(session, client, token, count_queries):
+    expected_statements = 1
+    session.expunge_all()
+
+    with count_queries() as statements:
+        response = client.post(
+            '/auth/refresh_token',
+            headers={'Authorization': f'Bearer {token}'},
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(statements) == expected_statements
+
+
+def test_refresh_token_with_cached_principal(
+    session, client, token, count_queries
+):
+    client.post(
+        '/auth/refresh_token',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    with count_queries() as statements:
+        response = client.post(
+            '/auth/refresh_token',
+            headers={'Authorization': f'Bearer {token}'},
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert statements == []
+
+
+def test_login_is_throttled_before_verifying_passwords(client, user):
+    app.dependency_overrides[get_settings] = lambda: get_settings().model_copy(
+        update={'RATE_LIMIT_LOGIN_PER_ACCOUNT': 2}
+    )
+    data = {'username': user.email, 'password': 'invalid_password'}
+
+    for _ in range(2):
+        client.post('/auth/token', data=data)
+
+    verifications = password_hasher.metrics.calls
+    response = client.post('/auth/token', data=data)
+
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert int(response.headers['retry-after']) > 0
+    assert password_hasher.metrics.calls == verifications
+
+    data['username'] = user.email.upper()
+
+    assert client.post('/auth/token', data=data).status_code == (
+        HTTPStatus.TOO_MANY_REQUESTS
+    )
+
+
+def test_login_is_throttled_per_ip(client, user, other_user):
+    app.dependency_overrides[get_settings] = lambda: get_settings().model_copy(
+        update={'RATE_LIMIT_LOGIN_PER_IP': 1}
+    )
+
+    response = client.post(
+        '/auth/token',
+        data={'username': user.email, 'password': user.clean_password},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+
+    response = client.post(
+        '/auth/token',
+        data={
+            'username': other_user.email,
+            'password': other_user.clean_password,
+        },
+    )
+
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
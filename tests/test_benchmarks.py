@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from benchmarks import serialization, startup
+from benchmarks.api import run
+from benchmarks.stats import compare, summarize
+from tests.conftest import TodoFactory
+
+
+def test_summarize():
+    result = summarize([0.001 * n for n in range(1, 101)], elapsed=2.0)
+
+    assert result == {
+        'requests': 100,
+        'rps': 50.0,
+        'p50_ms': 50.5,
+        'p95_ms': 95.05,
+        'p99_ms': 99.01,
+    }
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = {
+        'GET /todos/': {'p95_ms': 10.0, 'rps': 100.0},
+        'GET /users/': {'p95_ms': 10.0, 'rps': 100.0},
+    }
+    current = {
+        'GET /todos/': {'p95_ms': 11.0, 'rps': 95.0},
+        'GET /users/': {'p95_ms': 13.0, 'rps': 70.0},
+    }
+
+    assert compare(baseline, current, threshold=0.2) == [
+        'GET /users/: p95 10.0ms -> 13.0ms',
+        'GET /users/: rps 100.0 -> 70.0',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_run_smoke():
+    expected_requests = 2
+    results = await run(
+        users=1,
+        todos_per_user=5,
+        requests=expected_requests,
+        concurrency=1,
+        only=['GET /todos/'],
+    )
+
+    assert list(results) == ['GET /todos/']
+    assert results['GET /todos/']['requests'] == expected_requests
+
+
+def test_startup_smoke():
+    results = startup.run(runs=1)
+
+    assert list(results) == ['import fast_zero.app', 'first GET /users/']
+    assert results['import fast_zero.app']['requests'] == 1
+
+
+@pytest.mark.asyncio
+async def test_serialization_paths_produce_the_same_payload(session, user):
+    session.add_all(TodoFactory.create_batch(3, user_id=user.id))
+    await session.commit()
+
+    orm = await serialization.orm_response_model(session, user.id, 10)
+    rows = await serialization.rows_fast_json(session, user.id, 10)
+
+    assert json.loads(orm) == json.loads(rows)
+
+
+@pytest.mark.asyncio
+async def test_serialization_smoke():
+    results = await serialization.run(page=5, iterations=2)
+
+    assert list(results) == list(serialization.PATHS)
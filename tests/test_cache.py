@@ -0,0 +1,76 @@
+from time import time
+
+from fast_zero.cache import TokenCache
+
+
+def test_token_cache_returns_cached_value():
+    cache = TokenCache()
+
+    cache.set('token', 'principal', user_id=1, expires_at=time() + 60)
+
+    assert cache.get('token') == 'principal'
+    assert cache.get('other-token') is None
+
+
+def test_token_cache_drops_expired_entries():
+    cache = TokenCache()
+
+    cache.set('token', 'principal', user_id=1, expires_at=time() - 1)
+
+    assert cache.get('token') is None
+    assert len(cache) == 0
+
+
+def test_token_cache_evicts_least_recently_used():
+    cache = TokenCache(maxsize=2)
+    expires_at = time() + 60
+
+    cache.set('a', 'A', user_id=1, expires_at=expires_at)
+    cache.set('b', 'B', user_id=2, expires_at=expires_at)
+    cache.get('a')
+    cache.set('c', 'C', user_id=3, expires_at=expires_at)
+
+    assert cache.get('a') == 'A'
+    assert cache.get('b') is None
+    assert cache.get('c') == 'C'
+
+
+def test_token_cache_invalidate_user():
+    cache = TokenCache()
+    expires_at = time() + 60
+
+    cache.set('a', 'A', user_id=1, expires_at=expires_at)
+    cache.set('b', 'B', user_id=1, expires_at=expires_at)
+    cache.set('c', 'C', user_id=2, expires_at=expires_at)
+    cache.invalidate_user(1)
+
+    assert cache.get('a') is None
+    assert cache.get('b') is None
+    assert cache.get('c') == 'C'
+
+
+def test_token_cache_skips_values_loaded_before_invalidation():
+    cache = TokenCache()
+    expires_at = time() + 60
+    before = cache.generation
+
+    cache.invalidate_user(1)
+    cache.set('a', 'A', user_id=1, expires_at=expires_at, generation=before)
+    cache.set('b', 'B', user_id=2, expires_at=expires_at, generation=before)
+
+    assert cache.get('a') is None
+    assert cache.get('b') is None
+
+    cache.set(
+        'a', 'A', user_id=1, expires_at=expires_at, generation=cache.generation
+    )
+
+    assert cache.get('a') == 'A'
+
+
+def test_token_cache_disabled_with_zero_maxsize():
+    cache = TokenCache(maxsize=0)
+
+    cache.set('token', 'principal', user_id=1, expires_at=time() + 60)
+
+    assert cache.get('token') is None
@@ -0,0 +1,129 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+
+from fast_zero.app import app
+from fast_zero.events import (
+    OVERFLOW,
+    Event,
+    MemoryBroker,
+    event_stream,
+    get_broker,
+    todo_channel,
+)
+
+
+async def _next_frame(stream):
+    return await asyncio.wait_for(anext(stream), 1)
+
+
+@pytest.mark.asyncio
+async def test_publish_reaches_only_the_channel_subscribers():
+    broker = MemoryBroker()
+    event = Event('created', {'id': 1})
+
+    async with (
+        broker.subscribe('todos:1') as first,
+        broker.subscribe('todos:1') as second,
+        broker.subscribe('todos:2') as other,
+    ):
+        await broker.publish('todos:1', event)
+
+        assert await first.get() is event
+        assert await second.get() is event
+        assert other._queue.empty()
+
+    assert broker.subscribers('todos:1') == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_disconnected():
+    broker = MemoryBroker(queue_size=2)
+
+    async with broker.subscribe('todos:1') as subscription:
+        for todo_id in range(3):
+            await broker.publish('todos:1', Event('created', {'id': todo_id}))
+
+        assert broker.subscribers('todos:1') == 0
+        assert await subscription.get() is OVERFLOW
+        assert subscription._queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_event_stream_frames_events_and_keepalives():
+    broker = MemoryBroker(queue_size=1)
+    stream = event_stream(broker, 'todos:1', heartbeat=0.01)
+
+    assert await _next_frame(stream) == b': subscribed\n\n'
+    assert await _next_frame(stream) == b': keepalive\n\n'
+
+    await broker.publish('todos:1', Event('deleted', {'id': 1}))
+
+    assert await _next_frame(stream) == b'event: deleted\ndata: {"id":1}\n\n'
+
+    await broker.publish('todos:1', Event('deleted', {'id': 2}))
+    await broker.publish('todos:1', Event('deleted', {'id': 3}))
+
+    assert await _next_frame(stream) == b'event: overflow\ndata: {}\n\n'
+
+    with pytest.raises(StopAsyncIteration):
+        await _next_frame(stream)
+
+
+@pytest.mark.asyncio
+async def test_stream_todo_events(client, user, token):
+    # TestClient buffers whole responses, so the endless stream is driven
+    # through the ASGI interface directly.
+    broker = MemoryBroker()
+    app.dependency_overrides[get_broker] = lambda: broker
+    channel = todo_channel(user.id)
+    disconnected = asyncio.Event()
+    messages = []
+
+    async def receive():
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': '/todos/stream',
+        'raw_path': b'/todos/stream',
+        'root_path': '',
+        'query_string': b'',
+        'headers': [(b'authorization', f'Bearer {token}'.encode())],
+        'client': ('testclient', 50000),
+        'server': ('testserver', 80),
+    }
+    request = asyncio.create_task(app(scope, receive, send))
+
+    while not broker.subscribers(channel):
+        await asyncio.sleep(0.01)
+
+    await broker.publish(channel, Event('deleted', {'id': 1}))
+    await asyncio.sleep(0.01)
+    disconnected.set()
+    await asyncio.wait_for(request, 1)
+
+    start, *body = messages
+    headers = dict(start['headers'])
+
+    assert start['status'] == HTTPStatus.OK
+    assert headers[b'content-type'].startswith(b'text/event-stream')
+    assert b''.join(message.get('body', b'') for message in body) == (
+        b': subscribed\n\nevent: deleted\ndata: {"id":1}\n\n'
+    )
+    assert broker.subscribers(channel) == 0
+
+
+def test_stream_todo_events_requires_authentication(client):
+    response = client.get('/todos/stream')
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
@@ -0,0 +1,65 @@
+import logging
+from http import HTTPStatus
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from fast_zero.instrumentation import InstrumentationMiddleware, RequestStats
+from fast_zero.models import User
+
+
+def test_request_stats_tracks_slowest_statement():
+    stats = RequestStats()
+
+    stats.record('SELECT 1', 0.002)
+    stats.record('SELECT 2', 0.005)
+    stats.record('SELECT 1', 0.001)
+
+    assert stats.statements == 3  # noqa: PLR2004
+    assert stats.slowest_statement == 'SELECT 2'
+    assert stats.repeated['SELECT 1'] == 2  # noqa: PLR2004
+    assert stats.server_timing(0.01) == (
+        'db;dur=8.00;desc="3 statements", db-slowest;dur=5.00, app;dur=10.00'
+    )
+
+
+def test_server_timing_header_counts_statements(client, user, token):
+    response = client.get(
+        '/todos/', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert 'desc="3 statements"' in response.headers['Server-Timing']
+    assert 'app;dur=' in response.headers['Server-Timing']
+
+
+def test_statement_budget_logs_repeated_statements(session, user, caplog):
+    app = FastAPI()
+    app.add_middleware(InstrumentationMiddleware, statement_budget=2)
+
+    @app.get('/n-plus-one')
+    async def n_plus_one():
+        for _ in range(3):
+            await session.scalar(select(User).where(User.id == user.id))
+
+    with caplog.at_level(logging.WARNING, logger='fast_zero.instrumentation'):
+        response = TestClient(app).get('/n-plus-one')
+
+    assert 'desc="3 statements"' in response.headers['Server-Timing']
+    assert 'GET /n-plus-one issued 3 SQL statements' in caplog.text
+    assert 'Possible N+1 in GET /n-plus-one' in caplog.text
+
+
+def test_statement_budget_is_quiet_within_budget(session, user, caplog):
+    app = FastAPI()
+    app.add_middleware(InstrumentationMiddleware, statement_budget=2)
+
+    @app.get('/one')
+    async def one():
+        await session.scalar(select(User).where(User.id == user.id))
+
+    with caplog.at_level(logging.WARNING, logger='fast_zero.instrumentation'):
+        TestClient(app).get('/one')
+
+    assert not caplog.records
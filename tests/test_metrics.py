@@ -0,0 +1,133 @@
+from http import HTTPStatus
+
+import pytest
+
+from fast_zero.metrics import (
+    Registry,
+    db_pool_wait,
+    jwt_validation_failures,
+    password_hash_duration,
+)
+from fast_zero.security import get_password_hash
+
+
+def test_histogram_exposes_cumulative_buckets():
+    registry = Registry()
+    histogram = registry.histogram(
+        'latency_seconds', 'Latency.', ('route',), buckets=(0.1, 1.0)
+    )
+    child = histogram.labels('/a')
+
+    child.observe(0.05)
+    child.observe(0.5)
+    child.observe(5)
+
+    assert registry.expose() == (
+        '# HELP latency_seconds Latency.\n'
+        '# TYPE latency_seconds histogram\n'
+        'latency_seconds_bucket{route="/a",le="0.1"} 1\n'
+        'latency_seconds_bucket{route="/a",le="1.0"} 2\n'
+        'latency_seconds_bucket{route="/a",le="+Inf"} 3\n'
+        'latency_seconds_sum{route="/a"} 5.55\n'
+        'latency_seconds_count{route="/a"} 3\n'
+    )
+
+
+def test_counter_and_gauge_exposition():
+    registry = Registry()
+    counter = registry.counter('failures', 'Failures.', ('reason',))
+    gauge = registry.gauge('in_flight', 'In flight.')
+
+    counter.labels('say "hi"').inc()
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+
+    assert 'failures_total{reason="say \\"hi\\""} 1' in registry.expose()
+    assert 'in_flight 1' in registry.expose()
+
+
+def test_labels_are_cached():
+    registry = Registry()
+    counter = registry.counter('hits', 'Hits.', ('route',))
+
+    assert counter.labels('/a') is counter.labels('/a')
+
+
+def test_labels_must_match_label_names():
+    registry = Registry()
+    counter = registry.counter('hits', 'Hits.', ('route', 'method'))
+
+    with pytest.raises(ValueError, match='expects labels'):
+        counter.labels('/a')
+
+
+def test_registry_rejects_duplicate_names():
+    registry = Registry()
+    registry.counter('hits', 'Hits.')
+
+    with pytest.raises(ValueError, match='already registered'):
+        registry.counter('hits', 'Hits.')
+
+
+def test_metrics_endpoint_reports_route_latency(client, user, token):
+    client.get('/todos/', headers={'Authorization': f'Bearer {token}'})
+
+    response = client.get('/metrics')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'].startswith('text/plain')
+    assert (
+        'http_request_duration_seconds_count{method="GET",route="/todos/"}'
+        in response.text
+    )
+    assert 'http_requests_in_flight 1' in response.text
+
+
+def test_metrics_endpoint_groups_unmatched_routes(client):
+    client.get('/does-not-exist')
+
+    response = client.get('/metrics')
+
+    assert (
+        'http_request_duration_seconds_count{method="*",route="unmatched"}'
+        in response.text
+    )
+    assert 'does-not-exist' not in response.text
+
+
+def test_invalid_jwt_is_counted(client):
+    invalid = jwt_validation_failures.labels('invalid')
+    before = invalid.value
+
+    client.get('/todos/', headers={'Authorization': 'Bearer invalid'})
+
+    assert invalid.value == before + 1
+
+
+@pytest.mark.asyncio
+async def test_password_hash_duration_is_observed():
+    histogram = password_hash_duration.labels('hash')
+    before = histogram.counts[-1] + sum(histogram.counts[:-1])
+
+    await get_password_hash('secret')
+
+    assert sum(histogram.counts) == before + 1
+
+
+@pytest.mark.asyncio
+async def test_pool_checkout_wait_is_observed(tmp_path):
+    from fast_zero.database import create_engine  # noqa: PLC0415
+    from fast_zero.settings import Settings  # noqa: PLC0415
+
+    engine = create_engine(
+        Settings(DATABASE_URL=f'sqlite+aiosqlite:///{tmp_path}/db.sqlite')
+    )
+    before = sum(db_pool_wait.counts)
+
+    async with engine.connect():
+        pass
+
+    await engine.dispose()
+
+    assert sum(db_pool_wait.counts) == before + 1
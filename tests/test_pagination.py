@@ -0,0 +1,15 @@
+import pytest
+
+from fast_zero.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    key = 42
+
+    assert decode_cursor(encode_cursor(key)) == key
+
+
+@pytest.mark.parametrize('cursor', ['not-a-cursor', encode_cursor(-1)])
+def test_decode_invalid_cursor(cursor):
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        decode_cursor(cursor)
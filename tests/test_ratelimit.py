@@ -0,0 +1,55 @@
+import pytest
+
+from fast_zero.ratelimit import MemoryBucketStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_bucket_allows_a_burst_then_asks_to_wait():
+    store = MemoryBucketStore(clock=FakeClock())
+
+    for _ in range(3):
+        assert await store.take('key', capacity=3, rate=1.0) == 0
+
+    assert await store.take('key', capacity=3, rate=1.0) == 1.0
+
+
+@pytest.mark.asyncio
+async def test_bucket_refills_over_time():
+    clock = FakeClock()
+    store = MemoryBucketStore(clock=clock)
+
+    for _ in range(2):
+        await store.take('key', capacity=2, rate=0.5)
+
+    clock.now = 1.0
+
+    assert await store.take('key', capacity=2, rate=0.5) == 1.0
+
+    clock.now = 2.0
+
+    assert await store.take('key', capacity=2, rate=0.5) == 0
+    assert await store.take('other', capacity=2, rate=0.5) == 0
+
+
+@pytest.mark.asyncio
+async def test_sweep_drops_only_full_buckets():
+    expected_buckets = 2
+    clock = FakeClock()
+    store = MemoryBucketStore(sweep_interval=10, clock=clock)
+
+    await store.take('idle', capacity=1, rate=0.5)
+    clock.now = 9.0
+    await store.take('busy', capacity=1, rate=0.1)
+    clock.now = 10.0
+    await store.take('new', capacity=1, rate=0.5)
+
+    assert len(store) == expected_buckets
+    assert await store.take('busy', capacity=1, rate=0.1) > 0
@@ -0,0 +1,12 @@
+from fast_zero.search import (
+    get_todo_search,
+    like_search,
+    postgres_search,
+    sqlite_search,
+)
+
+
+def test_get_todo_search_by_dialect():
+    assert get_todo_search('sqlite') is sqlite_search
+    assert get_todo_search('postgresql') is postgres_search
+    assert get_todo_search('mysql') is like_search
@@ -1,11 +1,23 @@
+import asyncio
 from http import HTTPStatus
 
+import pytest
+from fastapi import HTTPException
 from jwt import decode
 
-from fast_zero.security import create_access_token, settings
+from fast_zero.app import app
+from fast_zero.security import (
+    PasswordHasher,
+    create_access_token,
+    get_current_user,
+    password_hasher,
+    token_cache,
+)
+from fast_zero.settings import get_settings
 
 
 def test_jwt():
+    settings = get_settings()
     data = {'test': 'test'}
     access_token = create_access_token(data)
     decoded = decode(
@@ -18,6 +30,22 @@ def test_jwt():
     assert 'exp' in decoded
 
 
+def test_settings_are_parsed_once():
+    assert get_settings() is get_settings()
+
+
+def test_jwt_uses_overridden_settings(client, user, token):
+    app.dependency_overrides[get_settings] = lambda: get_settings().model_copy(
+        update={'SECRET_KEY': 'rotated'}
+    )
+
+    response = client.get(
+        '/todos/', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
 def test_jwt_invalid_token(client):
     response = client.delete(
         '/users/1',
@@ -50,3 +78,77 @@ def test_jwt_with_inexistent_user(client):
 
     assert response.status_code == HTTPStatus.UNAUTHORIZED
     assert response.json() == {'detail': 'Could not validate credentials'}
+
+
+@pytest.mark.asyncio
+async def test_principal_invalidated_during_lookup_is_not_cached(
+    session, user, token, monkeypatch
+):
+    execute = session.execute
+
+    # Stands in for update_user/delete_user committing while the principal
+    # lookup is awaited.
+    async def execute_then_invalidate(statement):
+        result = await execute(statement)
+        token_cache.invalidate_user(user.id)
+        return result
+
+    monkeypatch.setattr(session, 'execute', execute_then_invalidate)
+    principal = await get_current_user(session, token, get_settings())
+
+    assert principal.id == user.id
+    assert token_cache.get(token) is None
+
+    monkeypatch.undo()
+    await get_current_user(session, token, get_settings())
+
+    assert token_cache.get(token) == principal
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_hash_and_verify():
+    expected_calls = 3
+    hasher = PasswordHasher(workers=1)
+
+    hashed = await hasher.hash('secret')
+
+    assert await hasher.verify('secret', hashed)
+    assert not await hasher.verify('wrong', hashed)
+    assert hasher.metrics.calls == expected_calls
+    assert hasher.metrics.hash_seconds > 0
+    assert hasher.pending == 0
+
+    hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_rejects_when_saturated():
+    hasher = PasswordHasher(workers=1, max_pending=1, retry_after=5)
+    first = asyncio.create_task(hasher.hash('secret'))
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await hasher.hash('other')
+
+    assert exc_info.value.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert exc_info.value.headers == {'Retry-After': '5'}
+    assert hasher.metrics.rejected == 1
+
+    await first
+    hasher.shutdown()
+
+
+def test_create_user_when_hasher_is_saturated(client, monkeypatch):
+    monkeypatch.setattr(password_hasher, 'max_pending', 0)
+
+    response = client.post(
+        '/users/',
+        json={
+            'username': 'alice',
+            'email': 'alice@example.com',
+            'password': 'secret',
+        },
+    )
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.headers['Retry-After'] == str(password_hasher.retry_after)
@@ -1,20 +1,17 @@
+import csv
+import io
+import json
 from http import HTTPStatus
 
-import factory
-import factory.fuzzy
 import pytest
+from sqlalchemy import delete, select
 
-from fast_zero.models import Todo, TodoState
-
-
-class TodoFactory(factory.Factory):
-    class Meta:
-        model = Todo
-
-    title = factory.Faker('text')
-    description = factory.Faker('text')
-    state = factory.fuzzy.FuzzyChoice(TodoState)
-    user_id = 1
+from fast_zero.app import app
+from fast_zero.events import MemoryBroker, get_broker, todo_channel
+from fast_zero.models import Todo, TodoState, User
+from fast_zero.schemas import MAX_BULK_ITEMS
+from fast_zero.settings import get_settings
+from tests.conftest import TodoFactory
 
 
 def test_create_todo(client, token):
@@ -205,3 +202,868 @@ def test_delete_todo_error(client, token):
 
     assert response.status_code == HTTPStatus.NOT_FOUND
     assert response.json() == {'detail': 'Task not found.'}
+
+
+def test_create_todo_statement_count(session, client, token, count_queries):
+    expected_statements = 2
+    session.expunge_all()
+
+    with count_queries() as statements:
+        response = client.post(
+            '/todos/',
+            headers={'Authorization': f'Bearer {token}'},
+            json={
+                'title': 'Test todo',
+                'description': 'Test todo description',
+                'state': 'draft',
+            },
+        )
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert len(statements) == expected_statements
+
+
+@pytest.mark.asyncio
+async def test_list_todos_statement_count(
+    session, client, user, token, count_queries
+):
+    # Principal, ETag version, page.
+    expected_statements = 3
+    session.add_all(TodoFactory.create_batch(5, user_id=user.id))
+    await session.commit()
+    session.expunge_all()
+
+    with count_queries() as statements:
+        response = client.get(
+            '/todos/',
+            headers={'Authorization': f'Bearer {token}'},
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(statements) == expected_statements
+
+
+@pytest.mark.asyncio
+async def test_patch_todo_statement_count(
+    session, client, user, token, count_queries
+):
+    expected_statements = 2
+    todo = TodoFactory(user_id=user.id)
+    session.add(todo)
+    await session.commit()
+    session.expunge_all()
+
+    with count_queries() as statements:
+        response = client.patch(
+            f'/todos/{todo.id}',
+            json={'title': 'teste!'},
+            headers={'Authorization': f'Bearer {token}'},
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(statements) == expected_statements
+
+
+@pytest.mark.asyncio
+async def test_delete_todo_statement_count(
+    session, client, user, token, count_queries
+):
+    expected_statements = 2
+    todo = TodoFactory(user_id=user.id)
+    session.add(todo)
+    await session.commit()
+    session.expunge_all()
+
+    with count_queries() as statements:
+        response = client.delete(
+            f'/todos/{todo.id}', headers={'Authorization': f'Bearer {token}'}
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(statements) == expected_statements
+
+
+@pytest.mark.asyncio
+async def test_list_todos_loads_no_entities(session, client, user, token):
+    session.add_all(TodoFactory.create_batch(3, user_id=user.id))
+    await session.commit()
+    session.expunge_all()
+
+    response = client.get(
+        '/todos/', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert len(response.json()['todos']) == 3  # noqa: PLR2004
+    assert len(session.identity_map) == 0
+
+
+@pytest.mark.asyncio
+async def test_list_todos_cursor_pagination(session, client, user, token):
+    session.add_all(TodoFactory.create_batch(5, user_id=user.id))
+    await session.commit()
+
+    seen = []
+    url = '/todos/?limit=2'
+
+    while True:
+        response = client.get(
+            url, headers={'Authorization': f'Bearer {token}'}
+        )
+        body = response.json()
+        seen.extend(todo['id'] for todo in body['todos'])
+
+        if body['next_cursor'] is None:
+            break
+
+        url = f'/todos/?limit=2&after={body["next_cursor"]}'
+
+    assert seen == [1, 2, 3, 4, 5]
+
+
+def test_list_todos_invalid_cursor(client, token):
+    response = client.get(
+        '/todos/?after=not-a-cursor',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_list_todos_limit_is_capped(client, token):
+    response = client.get(
+        '/todos/?limit=1000',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_list_todos_filter_title_follows_updates(
+    session, client, user, token
+):
+    todo = TodoFactory(user_id=user.id, title='Old title')
+    session.add(todo)
+    await session.commit()
+
+    client.patch(
+        f'/todos/{todo.id}',
+        json={'title': 'New title'},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    old = client.get(
+        '/todos/?title=Old', headers={'Authorization': f'Bearer {token}'}
+    )
+    new = client.get(
+        '/todos/?title=New', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert old.json()['todos'] == []
+    assert [t['id'] for t in new.json()['todos']] == [todo.id]
+
+
+@pytest.mark.asyncio
+async def test_list_todos_filter_is_ranked(session, client, user, token):
+    session.add_all([
+        TodoFactory(user_id=user.id, description='a plan among many words'),
+        TodoFactory(user_id=user.id, description='plan plan plan'),
+    ])
+    await session.commit()
+
+    response = client.get(
+        '/todos/?description=plan',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert [t['description'] for t in response.json()['todos']] == [
+        'plan plan plan',
+        'a plan among many words',
+    ]
+    assert response.json()['next_cursor'] is None
+
+
+def test_list_todos_filter_with_quotes(client, token):
+    response = client.get(
+        '/todos/?title="quoted"',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['todos'] == []
+
+
+def test_create_todos_bulk(session, client, token, count_queries):
+    expected_statements = 2
+    session.expunge_all()
+
+    with count_queries() as statements:
+        response = client.post(
+            '/todos/bulk',
+            headers={'Authorization': f'Bearer {token}'},
+            json={
+                'todos': [
+                    {'title': 'First', 'description': 'a', 'state': 'draft'},
+                    {'title': 'Second', 'description': 'b', 'state': 'done'},
+                ]
+            },
+        )
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert response.json() == {
+        'results': [
+            {
+                'id': 1,
+                'status': 'created',
+                'todo': {
+                    'id': 1,
+                    'title': 'First',
+                    'description': 'a',
+                    'state': 'draft',
+                },
+                'detail': None,
+            },
+            {
+                'id': 2,
+                'status': 'created',
+                'todo': {
+                    'id': 2,
+                    'title': 'Second',
+                    'description': 'b',
+                    'state': 'done',
+                },
+                'detail': None,
+            },
+        ]
+    }
+    assert len(statements) == expected_statements
+
+
+def test_create_todos_bulk_over_limit(client, token):
+    todo = {'title': 'Title', 'description': 'a', 'state': 'draft'}
+
+    response = client.post(
+        '/todos/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'todos': [todo] * (MAX_BULK_ITEMS + 1)},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_patch_todos_bulk(session, client, user, other_user, token):
+    mine = TodoFactory.create_batch(2, user_id=user.id, state=TodoState.todo)
+    theirs = TodoFactory(user_id=other_user.id, state=TodoState.todo)
+    session.add_all([*mine, theirs])
+    await session.commit()
+
+    response = client.patch(
+        '/todos/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'todos': [
+                {'id': mine[0].id, 'state': 'done'},
+                {'id': theirs.id, 'state': 'done'},
+                {'id': mine[1].id, 'title': 'Renamed'},
+            ]
+        },
+    )
+
+    results = response.json()['results']
+
+    assert response.status_code == HTTPStatus.OK
+    assert [r['status'] for r in results] == [
+        'updated',
+        'not_found',
+        'updated',
+    ]
+    assert results[0]['todo']['state'] == 'done'
+    assert results[2]['todo']['title'] == 'Renamed'
+    assert results[2]['todo']['state'] == 'todo'
+
+    await session.refresh(theirs)
+
+    assert theirs.state == TodoState.todo
+
+
+@pytest.mark.asyncio
+async def test_patch_todos_bulk_updates_once_per_column_set(
+    session, client, user, token, count_queries
+):
+    mine = TodoFactory.create_batch(4, user_id=user.id, state=TodoState.todo)
+    session.add_all(mine)
+    await session.commit()
+    # One UPDATE for the items changing state, one for those renamed.
+    expected_updates = 2
+
+    with count_queries() as statements:
+        response = client.patch(
+            '/todos/bulk',
+            headers={'Authorization': f'Bearer {token}'},
+            json={
+                'todos': [
+                    {'id': mine[0].id, 'state': 'done'},
+                    {'id': mine[1].id, 'title': 'Renamed'},
+                    {'id': mine[2].id, 'state': 'doing'},
+                    {'id': mine[3].id, 'title': 'Again'},
+                ]
+            },
+        )
+
+    updates = [s for s in statements if s.startswith('UPDATE todos')]
+
+    assert response.status_code == HTTPStatus.OK
+    assert [r['status'] for r in response.json()['results']] == [
+        'updated',
+        'updated',
+        'updated',
+        'updated',
+    ]
+    assert len(updates) == expected_updates
+
+
+@pytest.mark.asyncio
+async def test_patch_todos_bulk_rejects_nulls_per_item(
+    session, client, user, token
+):
+    mine = TodoFactory.create_batch(2, user_id=user.id, title='Kept')
+    session.add_all(mine)
+    await session.commit()
+
+    response = client.patch(
+        '/todos/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'todos': [
+                {'id': mine[0].id, 'title': None},
+                {'id': mine[1].id, 'title': 'Renamed'},
+            ]
+        },
+    )
+
+    results = response.json()['results']
+
+    assert response.status_code == HTTPStatus.OK
+    assert results[0] == {
+        'id': mine[0].id,
+        'status': 'invalid',
+        'todo': None,
+        'detail': 'title cannot be null',
+    }
+    assert results[1]['status'] == 'updated'
+    assert results[1]['todo']['title'] == 'Renamed'
+
+    await session.refresh(mine[0])
+
+    assert mine[0].title == 'Kept'
+
+
+@pytest.mark.asyncio
+async def test_delete_todos_bulk(session, client, user, other_user, token):
+    mine = TodoFactory(user_id=user.id)
+    theirs = TodoFactory(user_id=other_user.id)
+    session.add_all([mine, theirs])
+    await session.commit()
+
+    response = client.request(
+        'DELETE',
+        '/todos/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'ids': [mine.id, theirs.id]},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'results': [
+            {
+                'id': mine.id,
+                'status': 'deleted',
+                'todo': None,
+                'detail': None,
+            },
+            {
+                'id': theirs.id,
+                'status': 'not_found',
+                'todo': None,
+                'detail': None,
+            },
+        ]
+    }
+
+
+@pytest.mark.asyncio
+async def test_export_todos_ndjson(session, client, user, other_user, token):
+    todos = TodoFactory.create_batch(5, user_id=user.id)
+    session.add_all(todos)
+    session.add_all(TodoFactory.create_batch(2, user_id=other_user.id))
+    await session.commit()
+
+    # A fetch size smaller than the export makes it span several batches.
+    app.dependency_overrides[get_settings] = lambda: get_settings().model_copy(
+        update={'EXPORT_FETCH_SIZE': 2}
+    )
+    response = client.get(
+        '/todos/export', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {
+            'id': todo.id,
+            'title': todo.title,
+            'description': todo.description,
+            'state': todo.state,
+        }
+        for todo in todos
+    ]
+
+
+@pytest.mark.asyncio
+async def test_export_todos_csv(session, client, user, token):
+    todos = TodoFactory.create_batch(3, user_id=user.id)
+    session.add_all(todos)
+    await session.commit()
+
+    response = client.get(
+        '/todos/export?format=csv',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'].startswith('text/csv')
+    assert 'filename="todos.csv"' in response.headers['content-disposition']
+    assert list(csv.DictReader(io.StringIO(response.text))) == [
+        {
+            'id': str(todo.id),
+            'title': todo.title,
+            'description': todo.description,
+            'state': todo.state,
+        }
+        for todo in todos
+    ]
+
+
+def test_export_todos_rejects_unknown_format(client, token):
+    response = client.get(
+        '/todos/export?format=xml',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_import_todos_ndjson(session, client, user, token):
+    app.dependency_overrides[get_settings] = lambda: get_settings().model_copy(
+        update={'IMPORT_BATCH_SIZE': 2}
+    )
+
+    def body():
+        for index in range(5):
+            todo = {
+                'title': f'Todo {index}',
+                'description': 'imported',
+                'state': 'todo',
+            }
+            yield json.dumps(todo).encode() + b'\n'
+
+        yield b'{"title": "missing fields"}\n'
+
+    response = client.post(
+        '/todos/import',
+        content=body(),
+        headers={
+            'Authorization': f'Bearer {token}',
+            'Content-Type': 'application/x-ndjson',
+        },
+    )
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert response.json()['accepted'] == 5  # noqa: PLR2004
+    assert response.json()['rejected'] == 1
+    assert response.json()['errors'][0]['line'] == 6  # noqa: PLR2004
+
+    todos = await session.scalars(select(Todo).where(Todo.user_id == user.id))
+
+    assert sorted(todo.title for todo in todos) == [
+        f'Todo {index}' for index in range(5)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_import_accepts_an_export(session, client, user, token):
+    session.add_all(TodoFactory.create_batch(3, user_id=user.id))
+    await session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    exported = client.get('/todos/export?format=csv', headers=headers)
+    response = client.post(
+        '/todos/import?format=csv', content=exported.content, headers=headers
+    )
+
+    assert response.json() == {'accepted': 3, 'rejected': 0, 'errors': []}
+
+
+@pytest.mark.asyncio
+async def test_todo_stats_follow_every_write_path(
+    session, client, user, other_user, token
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    session.add_all(TodoFactory.create_batch(2, user_id=other_user.id))
+    await session.commit()
+
+    created = client.post(
+        '/todos/bulk',
+        headers=headers,
+        json={
+            'todos': [
+                {'title': 'a', 'description': 'a', 'state': 'todo'},
+                {'title': 'b', 'description': 'b', 'state': 'todo'},
+                {'title': 'c', 'description': 'c', 'state': 'draft'},
+            ]
+        },
+    ).json()['results']
+    client.patch(
+        f'/todos/{created[0]["id"]}', headers=headers, json={'state': 'done'}
+    )
+    client.delete(f'/todos/{created[2]["id"]}', headers=headers)
+
+    response = client.get('/todos/stats', headers=headers)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'total': 2,
+        'states': {
+            'draft': 0,
+            'todo': 1,
+            'doing': 0,
+            'done': 1,
+            'trash': 0,
+        },
+    }
+
+
+def test_todo_stats_statement_count(client, token, count_queries):
+    expected_statements = 2
+
+    with count_queries() as statements:
+        response = client.get(
+            '/todos/stats', headers={'Authorization': f'Bearer {token}'}
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['total'] == 0
+    assert len(statements) == expected_statements
+    assert 'FROM todo_counts' in statements[-1]
+
+
+@pytest.mark.asyncio
+async def test_list_todos_total_from_counters(
+    session, client, user, token, count_queries
+):
+    expected_statements = 4
+    session.add_all(TodoFactory.create_batch(3, user_id=user.id, state='done'))
+    session.add_all(TodoFactory.create_batch(2, user_id=user.id, state='todo'))
+    await session.commit()
+
+    with count_queries() as statements:
+        response = client.get(
+            '/todos/?include_total=true&state=done&limit=1',
+            headers={'Authorization': f'Bearer {token}'},
+        )
+
+    assert len(response.json()['todos']) == 1
+    assert response.json()['total'] == 3  # noqa: PLR2004
+    assert response.json()['total_is_exact'] is True
+    assert len(statements) == expected_statements
+    assert 'FROM todo_counts' in statements[-1]
+
+
+@pytest.mark.asyncio
+async def test_list_todos_total_is_omitted_by_default(client, token):
+    response = client.get(
+        '/todos/', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.json()['total'] is None
+    assert response.json()['total_is_exact'] is None
+
+
+@pytest.mark.asyncio
+async def test_list_todos_total_for_text_search(session, client, user, token):
+    session.add_all(
+        TodoFactory.create_batch(3, user_id=user.id, title='Buy milk')
+    )
+    session.add_all(
+        TodoFactory.create_batch(2, user_id=user.id, title='Walk dog')
+    )
+    await session.commit()
+
+    response = client.get(
+        '/todos/?include_total=true&title=milk&limit=1',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.json()['total'] == 3  # noqa: PLR2004
+    assert response.json()['total_is_exact'] is True
+
+
+@pytest.mark.asyncio
+async def test_list_todos_total_estimated_past_threshold(
+    session, client, user, token
+):
+    # The four most recent todos are sampled; half of them match.
+    session.add_all(
+        TodoFactory.create_batch(6, user_id=user.id, title='Walk dog')
+    )
+    session.add_all(
+        TodoFactory.create_batch(2, user_id=user.id, title='Buy milk')
+    )
+    await session.commit()
+    app.dependency_overrides[get_settings] = lambda: get_settings().model_copy(
+        update={'TODO_TOTAL_EXACT_THRESHOLD': 0, 'TODO_TOTAL_SAMPLE_SIZE': 4}
+    )
+
+    response = client.get(
+        '/todos/?include_total=true&title=Buy',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.json()['total'] == 4  # noqa: PLR2004
+    assert response.json()['total_is_exact'] is False
+
+
+@pytest.mark.asyncio
+async def test_list_todos_total_is_exact_when_sample_covers_candidates(
+    session, client, user, token
+):
+    session.add_all(
+        TodoFactory.create_batch(2, user_id=user.id, title='Buy milk')
+    )
+    await session.commit()
+    app.dependency_overrides[get_settings] = lambda: get_settings().model_copy(
+        update={'TODO_TOTAL_EXACT_THRESHOLD': 0, 'TODO_TOTAL_SAMPLE_SIZE': 4}
+    )
+
+    response = client.get(
+        '/todos/?include_total=true&title=Buy',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.json()['total'] == 2  # noqa: PLR2004
+    assert response.json()['total_is_exact'] is True
+
+
+@pytest.mark.asyncio
+async def test_list_todos_revalidates_with_etag(
+    session, client, user, token, count_queries
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    session.add_all(TodoFactory.create_batch(3, user_id=user.id))
+    await session.commit()
+
+    first = client.get('/todos/?limit=2', headers=headers)
+    etag = first.headers['etag']
+
+    with count_queries() as statements:
+        response = client.get(
+            '/todos/?limit=2', headers={**headers, 'If-None-Match': etag}
+        )
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.headers['etag'] == etag
+    assert not response.content
+    assert len(statements) == 1
+    assert 'todo_version' in statements[0]
+
+    other_page = client.get(
+        '/todos/?limit=1', headers={**headers, 'If-None-Match': etag}
+    )
+
+    assert other_page.status_code == HTTPStatus.OK
+
+
+def test_list_todos_etag_changes_after_write(client, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    etag = client.get('/todos/', headers=headers).headers['etag']
+
+    client.post(
+        '/todos/',
+        headers=headers,
+        json={'title': 'a', 'description': 'b', 'state': 'todo'},
+    )
+    response = client.get(
+        '/todos/', headers={**headers, 'If-None-Match': etag}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['etag'] != etag
+    assert len(response.json()['todos']) == 1
+
+
+@pytest.mark.asyncio
+async def test_list_todo_changes_since_last_sync(
+    session, client, user, token, count_queries
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    session.add_all(TodoFactory.create_batch(3, user_id=user.id))
+    await session.commit()
+
+    first = client.get('/todos/changes', headers=headers).json()
+
+    assert [todo['id'] for todo in first['todos']] == [1, 2, 3]
+    assert first['deleted'] == []
+    assert first['has_more'] is False
+
+    client.patch('/todos/2', headers=headers, json={'state': 'done'})
+    client.delete('/todos/3', headers=headers)
+    response = client.get(
+        f'/todos/changes?since={first["next_since"]}', headers=headers
+    )
+    changes = response.json()
+
+    assert response.status_code == HTTPStatus.OK
+    assert [todo['id'] for todo in changes['todos']] == [2]
+    assert changes['todos'][0]['state'] == 'done'
+    assert changes['deleted'] == [3]
+
+    with count_queries() as statements:
+        caught_up = client.get(
+            f'/todos/changes?since={changes["next_since"]}', headers=headers
+        )
+
+    assert caught_up.json() == {
+        'todos': [],
+        'deleted': [],
+        'next_since': changes['next_since'],
+        'has_more': False,
+    }
+    assert len(statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_list_todo_changes_pages_in_sequence_order(
+    session, client, user, token
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    session.add_all(TodoFactory.create_batch(3, user_id=user.id))
+    await session.commit()
+
+    client.delete('/todos/1', headers=headers)
+    client.patch('/todos/2', headers=headers, json={'title': 'Renamed'})
+
+    page = client.get('/todos/changes?limit=2', headers=headers).json()
+
+    assert [todo['id'] for todo in page['todos']] == [3]
+    assert page['deleted'] == [1]
+    assert page['has_more'] is True
+
+    page = client.get(
+        f'/todos/changes?limit=2&since={page["next_since"]}', headers=headers
+    ).json()
+
+    assert [todo['title'] for todo in page['todos']] == ['Renamed']
+    assert page['deleted'] == []
+    assert page['has_more'] is False
+
+
+@pytest.mark.asyncio
+async def test_list_todo_changes_without_user_row(
+    session, client, user, token
+):
+    # A read replica that lags behind may not have the user row yet; the
+    # cached principal still authenticates the request.
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get('/todos/changes', headers=headers)
+    await session.execute(delete(User).where(User.id == user.id))
+    await session.commit()
+
+    response = client.get('/todos/changes?since=3', headers=headers)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'todos': [],
+        'deleted': [],
+        'next_since': 0,
+        'has_more': False,
+    }
+
+
+@pytest.mark.asyncio
+async def test_todo_writes_publish_events(client, user, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    broker = MemoryBroker()
+    app.dependency_overrides[get_broker] = lambda: broker
+
+    async with broker.subscribe(todo_channel(user.id)) as subscription:
+        client.post(
+            '/todos/',
+            headers=headers,
+            json={'title': 'a', 'description': 'b', 'state': 'todo'},
+        )
+        client.patch('/todos/1', headers=headers, json={'state': 'done'})
+        client.patch('/todos/1', headers=headers, json={})
+        client.delete('/todos/1', headers=headers)
+
+        events = [subscription._queue.get_nowait() for _ in range(3)]
+
+        assert subscription._queue.empty()
+
+    assert [(event.type, event.data) for event in events] == [
+        (
+            'created',
+            {'id': 1, 'title': 'a', 'description': 'b', 'state': 'todo'},
+        ),
+        (
+            'updated',
+            {'id': 1, 'title': 'a', 'description': 'b', 'state': 'done'},
+        ),
+        ('deleted', {'id': 1}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_bulk_writes_and_imports_publish_changed_events(
+    client, user, token
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    broker = MemoryBroker()
+    app.dependency_overrides[get_broker] = lambda: broker
+    app.dependency_overrides[get_settings] = lambda: get_settings().model_copy(
+        update={'IMPORT_BATCH_SIZE': 2}
+    )
+    todo = {'title': 'a', 'description': 'b', 'state': 'todo'}
+
+    async with broker.subscribe(todo_channel(user.id)) as subscription:
+        client.post('/todos/bulk', headers=headers, json={'todos': [todo] * 2})
+        client.patch(
+            '/todos/bulk',
+            headers=headers,
+            json={'todos': [{'id': 1, 'state': 'done'}, {'id': 99}]},
+        )
+        client.request(
+            'DELETE', '/todos/bulk', headers=headers, json={'ids': [1, 2]}
+        )
+        client.request(
+            'DELETE', '/todos/bulk', headers=headers, json={'ids': [1]}
+        )
+        client.post(
+            '/todos/import',
+            content=(json.dumps(todo) + '\n') * 3,
+            headers={**headers, 'Content-Type': 'application/x-ndjson'},
+        )
+
+        events = []
+
+        while not subscription._queue.empty():
+            events.append(subscription._queue.get_nowait())
+
+    assert [(event.type, event.data) for event in events] == [
+        ('changed', {'count': 2}),
+        ('changed', {'count': 1}),
+        ('changed', {'count': 2}),
+        ('changed', {'count': 2}),
+        ('changed', {'count': 1}),
+    ]
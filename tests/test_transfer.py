@@ -0,0 +1,94 @@
+import pytest
+
+from fast_zero.schemas import TodoSchema
+from fast_zero.transfer import iter_lines, parse_csv, parse_ndjson
+
+
+async def _chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def _collect(iterator):
+    return [item async for item in iterator]
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_joins_lines_split_across_chunks():
+    lines = iter_lines(_chunks(b'fir', b'st\nsec', b'ond\n', b'third'), 64)
+
+    assert await _collect(lines) == [
+        (1, b'first'),
+        (2, b'second'),
+        (3, b'third'),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_drops_overlong_lines():
+    lines = iter_lines(_chunks(b'ok\n', b'x' * 5, b'x' * 5, b'x\nok\n'), 8)
+
+    assert await _collect(lines) == [(1, b'ok'), (2, None), (3, b'ok')]
+
+
+@pytest.mark.asyncio
+async def test_parse_ndjson_reports_invalid_lines():
+    lines = iter_lines(
+        _chunks(
+            b'{"title": "a", "description": "b", "state": "todo"}\n',
+            b'\n',
+            b'{"title": "a", "state": "nope"}\n',
+            b'not json\n',
+        ),
+        1024,
+    )
+
+    records = await _collect(parse_ndjson(lines))
+
+    assert records[0] == (
+        1,
+        TodoSchema(title='a', description='b', state='todo'),
+    )
+    assert [line for line, _ in records[1:]] == [3, 4]
+    assert 'description: Field required' in records[1][1]
+    assert 'state: Input should be' in records[1][1]
+
+
+@pytest.mark.asyncio
+async def test_parse_csv_handles_quoted_newlines():
+    lines = iter_lines(
+        _chunks(
+            b'title,description,state\r\n',
+            b'plain,row,todo\r\n',
+            b'"multi","first\nsecond ""quoted""",done\r\n',
+            b'bad,row,nope\r\n',
+        ),
+        1024,
+    )
+
+    records = await _collect(parse_csv(lines, 1024))
+
+    assert records[:2] == [
+        (2, TodoSchema(title='plain', description='row', state='todo')),
+        (
+            3,
+            TodoSchema(
+                title='multi',
+                description='first\nsecond "quoted"',
+                state='done',
+            ),
+        ),
+    ]
+    assert records[2][0] == 5  # noqa: PLR2004
+    assert 'state: Input should be' in records[2][1]
+
+
+@pytest.mark.asyncio
+async def test_parse_csv_reports_unterminated_quote():
+    lines = iter_lines(
+        _chunks(b'title,description,state\n', b'"open,row,todo\n'), 1024
+    )
+
+    assert await _collect(parse_csv(lines, 1024)) == [
+        (2, 'Unterminated quoted field')
+    ]
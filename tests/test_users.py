@@ -1,7 +1,14 @@
 import re
 from http import HTTPStatus
 
+import pytest
+from sqlalchemy import select
+
+from fast_zero.app import app
+from fast_zero.models import Todo
 from fast_zero.schemas import UserPublic
+from fast_zero.settings import get_settings
+from tests.conftest import TodoFactory
 
 
 def test_create_user_successfully(client):
@@ -22,6 +29,23 @@ def test_create_user_successfully(client):
     }
 
 
+def test_create_user_statement_count(session, client, count_queries):
+    expected_statements = 2
+
+    with count_queries() as statements:
+        response = client.post(
+            '/users/',
+            json={
+                'username': 'alice',
+                'email': 'alice@example.com',
+                'password': 'secret',
+            },
+        )
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert len(statements) == expected_statements
+
+
 def test_create_user_with_invalid_username(client, user):
     response = client.post(
         '/users/',
@@ -55,7 +79,16 @@ def test_list_users_successfully(client, user):
     response = client.get('/users/')
 
     assert response.status_code == HTTPStatus.OK
-    assert response.json() == {'users': [user_schema]}
+    assert response.json() == {'users': [user_schema], 'next_cursor': None}
+
+
+def test_find_user_does_not_select_password(client, user, count_queries):
+    with count_queries() as statements:
+        response = client.get(f'/users/{user.id}')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['username'] == user.username
+    assert not any('password' in statement for statement in statements)
 
 
 def test_update_user_successfully(client, user, token):
@@ -140,6 +173,27 @@ def test_delete_user_successfully(client, user, token):
     assert response.json() == {'message': 'User deleted!'}
 
 
+@pytest.mark.asyncio
+async def test_delete_user_cascades_to_todos(
+    session, client, user, other_user, token
+):
+    session.add_all([
+        *TodoFactory.create_batch(3, user_id=user.id),
+        TodoFactory(user_id=other_user.id),
+    ])
+    await session.commit()
+
+    response = client.delete(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    remaining = await session.scalars(select(Todo.user_id))
+
+    assert response.status_code == HTTPStatus.OK
+    assert remaining.all() == [other_user.id]
+
+
 def test_delete_user_with_wrong_user(client, other_user, token):
     response = client.delete(
         f'/users/{other_user.id}',
@@ -148,3 +202,140 @@ def test_delete_user_with_wrong_user(client, other_user, token):
 
     assert response.status_code == HTTPStatus.FORBIDDEN
     assert response.json() == {'detail': 'Not enough permissions'}
+
+
+def test_update_user_statement_count(
+    session, client, user, token, count_queries
+):
+    expected_statements = 2
+    session.expunge_all()
+
+    with count_queries() as statements:
+        response = client.put(
+            f'/users/{user.id}',
+            headers={'Authorization': f'Bearer {token}'},
+            json={
+                'username': 'bob',
+                'email': 'bob@example.com',
+                'password': 'mynewpassword',
+            },
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(statements) == expected_statements
+
+
+def test_delete_user_statement_count(
+    session, client, user, token, count_queries
+):
+    expected_statements = 2
+    session.expunge_all()
+
+    with count_queries() as statements:
+        response = client.delete(
+            f'/users/{user.id}',
+            headers={'Authorization': f'Bearer {token}'},
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(statements) == expected_statements
+
+
+def test_update_user_invalidates_cached_token(client, user, token):
+    client.put(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'username': 'bob',
+            'email': 'bob@example.com',
+            'password': 'mynewpassword',
+        },
+    )
+
+    response = client.put(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'username': 'carol',
+            'email': 'carol@example.com',
+            'password': 'mynewpassword',
+        },
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    assert response.json() == {'detail': 'Could not validate credentials'}
+
+
+def test_delete_user_invalidates_cached_token(client, user, token):
+    client.delete(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    response = client.delete(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    assert response.json() == {'detail': 'Could not validate credentials'}
+
+
+def test_list_users_cursor_pagination(client, user, other_user):
+    response = client.get('/users/?limit=1')
+    first_page = response.json()
+
+    response = client.get(f'/users/?limit=1&after={first_page["next_cursor"]}')
+    second_page = response.json()
+
+    assert [u['id'] for u in first_page['users']] == [user.id]
+    assert [u['id'] for u in second_page['users']] == [other_user.id]
+    assert second_page['next_cursor'] is None
+
+
+def test_find_user_revalidates_with_etag(client, user, token, count_queries):
+    etag = client.get(f'/users/{user.id}').headers['etag']
+
+    with count_queries() as statements:
+        response = client.get(
+            f'/users/{user.id}', headers={'If-None-Match': f'W/{etag}'}
+        )
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert len(statements) == 1
+
+    client.put(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'username': 'renamed',
+            'email': user.email,
+            'password': 'secret',
+        },
+    )
+    response = client.get(f'/users/{user.id}', headers={'If-None-Match': etag})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['username'] == 'renamed'
+    assert response.headers['etag'] != etag
+
+
+def test_create_user_is_throttled_per_ip(client):
+    app.dependency_overrides[get_settings] = lambda: get_settings().model_copy(
+        update={'RATE_LIMIT_SIGNUP_PER_IP': 1}
+    )
+
+    for username, status_code in [
+        ('alice', HTTPStatus.CREATED),
+        ('bob', HTTPStatus.TOO_MANY_REQUESTS),
+    ]:
+        response = client.post(
+            '/users/',
+            json={
+                'username': username,
+                'email': f'{username}@example.com',
+                'password': 'secret',
+            },
+        )
+
+        assert response.status_code == status_code